@@ -6,7 +6,8 @@ This script sends personalized outreach emails to leads from tech scans:
 1. Pulls leads from Supabase (has emails, has technologies, not emailed)
 2. Rotates through Zapmail pre-warmed SMTP inboxes
 3. Sends personalized emails with rate limiting
-4. Marks leads as emailed in Supabase
+4. Marks leads as emailed in Supabase (or as skipped when their recipient
+   was already emailed via another lead)
 
 Designed to run after pipeline_worker.py:
     python pipeline_worker.py && python outreach_worker.py
@@ -20,6 +21,8 @@ Optional Environment Variables:
     OUTREACH_TABLE: Table with leads (default: tech_scans)
     OUTREACH_DAILY_LIMIT: Max emails per day (default: 500)
     OUTREACH_PER_INBOX_LIMIT: Max emails per inbox (default: 50)
+    OUTREACH_RECIPIENT_COOLDOWN_DAYS: Skip recipients emailed within this many
+        days by an earlier run (default: 7, set to 0 to disable)
     SMTP_SEND_DELAY_SECONDS: Delay between emails (default: 4)
     LOG_LEVEL: Logging level (default: INFO)
 """
@@ -31,11 +34,12 @@ import smtplib
 import ssl
 import sys
 import time
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
-from supabase import create_client
+import httpx
+from supabase import ClientOptions, create_client
 
 from prospectpilot.email_generator import (
     generate_outreach_email_with_persona,
@@ -88,6 +92,13 @@ PER_INBOX_LIMIT = int(os.getenv("OUTREACH_PER_INBOX_LIMIT", "50"))
 
 SEND_DELAY = int(os.getenv("SMTP_SEND_DELAY_SECONDS", "4"))
 
+# Recipients emailed within this window (by any lead row) are not emailed again.
+# Set to 0 to only dedupe within the current run.
+RECIPIENT_COOLDOWN_DAYS = int(os.getenv("OUTREACH_RECIPIENT_COOLDOWN_DAYS", "7"))
+# Rows per request when paging through recent recipients; kept at or below
+# PostgREST's max-rows cap (1000 on Supabase) so no page is truncated
+RECIPIENT_PAGE_SIZE = 1000
+
 
 def log_config():
     """Log current configuration (without sensitive values)."""
@@ -100,23 +111,47 @@ def log_config():
     logger.info(f"  DAILY_LIMIT: {DAILY_LIMIT}")
     logger.info(f"  PER_INBOX_LIMIT: {PER_INBOX_LIMIT}")
     logger.info(f"  SEND_DELAY: {SEND_DELAY} seconds")
+    logger.info(f"  RECIPIENT_COOLDOWN_DAYS: {RECIPIENT_COOLDOWN_DAYS}")
     logger.info(f"  SMTP_ACCOUNTS_JSON: {'[SET]' if os.getenv('SMTP_ACCOUNTS_JSON') else '[NOT SET]'}")
     logger.info("=" * 60)
 
 
 def get_supabase_client():
-    """Create and return a Supabase client."""
+    """
+    Create and return a Supabase client.
+
+    The client is built on one long-lived httpx client with keep-alive and
+    HTTP/2 enabled, so the per-lead update calls in the send loop reuse a
+    single TLS connection instead of handshaking with Supabase each time.
+    """
     logger.info("Initializing Supabase client...")
     if not SUPABASE_URL or not SUPABASE_KEY:
         logger.error("Missing required environment variables: SUPABASE_URL and/or SUPABASE_SERVICE_KEY")
         raise ValueError(
             "SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables are required"
         )
-    client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    http_client = httpx.Client(
+        http2=True,
+        timeout=httpx.Timeout(120.0),
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60.0),
+    )
+    client = create_client(
+        SUPABASE_URL,
+        SUPABASE_KEY,
+        options=ClientOptions(httpx_client=http_client),
+    )
     logger.info("Supabase client initialized successfully")
     return client
 
 
+def mask_email(email: str) -> str:
+    """Mask an email address for logging (e.g. 'sco***@closespark.co')."""
+    at = email.find("@")
+    if at == -1:
+        return email[:3] + "***"
+    return email[:3] + "***" + email[at:]
+
+
 def get_smtp_fleet() -> list[dict]:
     """
     Load SMTP accounts from environment variable.
@@ -169,15 +204,16 @@ def get_smtp_fleet() -> list[dict]:
                     "port": account.get("port", 587),
                     "pass": account.get("pass"),
                 }
+            # Mask once here so log lines never recompute it
+            normalized["masked_email"] = mask_email(
+                normalized["email"] or normalized["user"] or "unknown"
+            )
             fleet.append(normalized)
         
         # Log inbox count without exposing credentials
         logger.info(f"Loaded {len(fleet)} SMTP accounts successfully")
         for i, account in enumerate(fleet):
-            # Mask email for privacy
-            email = account.get("email", "unknown")
-            masked_email = email[:3] + "***" + email[email.find("@"):] if "@" in email else email[:3] + "***"
-            logger.debug(f"  Account {i+1}: {masked_email} @ {account.get('host', 'unknown')}:{account.get('port', 587)}")
+            logger.debug(f"  Account {i+1}: {account['masked_email']} @ {account.get('host', 'unknown')}:{account.get('port', 587)}")
         return fleet
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in SMTP_ACCOUNTS_JSON: {e}")
@@ -245,16 +281,124 @@ def fetch_leads(supabase) -> list[dict]:
     return leads
 
 
+def fetch_recent_recipients(supabase, days: int = 7) -> set[str]:
+    """
+    Get recipient addresses already emailed within the cooldown period.
+
+    One company often has several tech_scans rows that all list the same
+    contact. Prefetching the recently emailed
+    recipients once lets run_outreach skip those leads without spending a
+    rate-limited inbox send on a duplicate.
+
+    Args:
+        supabase: Supabase client instance
+        days: Number of days to look back
+
+    Returns:
+        Set of lowercased recipient emails sent to within the period
+    """
+    if days <= 0:
+        logger.info("Recipient cooldown disabled (OUTREACH_RECIPIENT_COOLDOWN_DAYS=0)")
+        return set()
+
+    logger.info(f"Fetching recipients emailed in the last {days} days...")
+    try:
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+        recent = set()
+        # The window can hold more rows than PostgREST returns per request,
+        # so page through it until a short page comes back. The query is
+        # rebuilt per page because range() appends offset/limit params to
+        # the builder instead of replacing them.
+        start = 0
+        while True:
+            rows = (
+                supabase.table(OUTREACH_TABLE)
+                .select("emails")
+                .gte("emailed_at", cutoff)
+                .order("id")
+                .range(start, start + RECIPIENT_PAGE_SIZE - 1)
+                .execute()
+            ).data or []
+            # run_outreach always sends to the first address in the list
+            recent.update(row["emails"][0].lower() for row in rows if row.get("emails"))
+            if len(rows) < RECIPIENT_PAGE_SIZE:
+                break
+            start += RECIPIENT_PAGE_SIZE
+        logger.info(f"Found {len(recent)} recipients emailed in the last {days} days")
+        return recent
+    except Exception as e:
+        # Don't block outreach if the lookup fails; in-run dedup still applies
+        logger.warning(f"Could not fetch recently emailed recipients: {e}")
+        return set()
+
+
 # ========================
 # SMTP Rotation Engine
 # ========================
 
 
+class SmtpSession:
+    """
+    A logged-in SMTP connection for one inbox, reused across sends.
+
+    Connecting, STARTTLS and AUTH happen on the first send; later sends go
+    over the same connection. If the server has dropped an idle connection
+    in the meantime, the session reconnects once and retries.
+    """
+
+    def __init__(self, smtp_conf: dict):
+        self.smtp_conf = smtp_conf
+        self.server: smtplib.SMTP | None = None
+
+    def _connect(self) -> smtplib.SMTP:
+        host, port = self.smtp_conf["host"], self.smtp_conf.get("port", 587)
+        logger.debug(f"Connecting to SMTP server {host}:{port}...")
+        server = smtplib.SMTP(host, port)
+        try:
+            server.starttls(context=ssl.create_default_context())
+            logger.debug("STARTTLS established, logging in...")
+            server.login(self.smtp_conf["user"], self.smtp_conf["pass"])
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def sendmail(self, from_addr: str, to_addrs: list[str], msg: str) -> None:
+        """Send a message, (re)connecting as needed."""
+        if self.server is None:
+            self.server = self._connect()
+        try:
+            self.server.sendmail(from_addr, to_addrs, msg)
+        except smtplib.SMTPServerDisconnected:
+            logger.debug("SMTP connection was closed by the server, reconnecting...")
+            self.server = self._connect()
+            self.server.sendmail(from_addr, to_addrs, msg)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+            # The server answered, so the connection is still usable
+            raise
+        except OSError:
+            # Socket-level failure; start fresh on the next send
+            self.server.close()
+            self.server = None
+            raise
+
+    def close(self) -> None:
+        """Log out and close the connection, if open."""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+
+
 def send_email_smtp(
     smtp_conf: dict,
     to_email: str,
     subject: str,
     body: str,
+    session: SmtpSession | None = None,
 ) -> bool:
     """
     Send an email through SMTP.
@@ -264,6 +408,8 @@ def send_email_smtp(
         to_email: Recipient email address
         subject: Email subject
         body: Email body text
+        session: Optional SmtpSession to reuse an open connection; without
+            one, a connection is opened and closed for this email
 
     Returns:
         True if email was sent successfully
@@ -284,21 +430,21 @@ def send_email_smtp(
         body,
     )
 
-    context = ssl.create_default_context()
+    owns_session = session is None
+    if owns_session:
+        session = SmtpSession(smtp_conf)
 
     try:
-        logger.debug(f"Connecting to SMTP server {smtp_conf['host']}:{smtp_conf.get('port', 587)}...")
-        with smtplib.SMTP(smtp_conf["host"], smtp_conf.get("port", 587)) as server:
-            server.starttls(context=context)
-            logger.debug("STARTTLS established, logging in...")
-            server.login(smtp_conf["user"], smtp_conf["pass"])
-            logger.debug(f"Sending email to {to_email}...")
-            server.sendmail(msg["From"], [msg["To"]], msg.as_string())
+        logger.debug(f"Sending email to {to_email}...")
+        session.sendmail(msg["From"], [msg["To"]], msg.as_string())
         logger.debug("Email sent successfully")
         return True
     except smtplib.SMTPException as e:
         logger.error(f"SMTP error while sending to {to_email}: {e}")
         return False
+    finally:
+        if owns_session:
+            session.close()
 
 
 def mark_lead_emailed(supabase, lead_id: str) -> None:
@@ -319,6 +465,23 @@ def mark_lead_emailed(supabase, lead_id: str) -> None:
     logger.debug(f"Lead {lead_id} marked as emailed")
 
 
+def mark_lead_skipped(supabase, lead_id: str) -> None:
+    """
+    Mark a lead as handled without emailing it.
+
+    Used for leads whose recipient was already emailed via another row.
+    Setting emailed to false (not null) drops the lead from fetch_leads, so
+    it stops taking up the daily fetch and is never emailed once the
+    recipient cooldown lapses.
+
+    Args:
+        supabase: Supabase client instance
+        lead_id: The lead's ID
+    """
+    logger.debug(f"Marking lead {lead_id} as skipped in Supabase...")
+    supabase.table(OUTREACH_TABLE).update({"emailed": False}).eq("id", lead_id).execute()
+
+
 # ========================
 # Main Outreach Logic
 # ========================
@@ -374,91 +537,113 @@ def run_outreach() -> dict[str, int]:
         logger.info(f"Rotation mode: per-email (round-robin across all inboxes)")
 
         stats = {"sent": 0, "failed": 0, "skipped": 0}
+        # Recipients already emailed (earlier runs + this run), lowercased
+        sent_recipients = fetch_recent_recipients(supabase, RECIPIENT_COOLDOWN_DAYS)
         # Track sends per inbox for per-inbox limit enforcement
         inbox_send_counts = [0] * len(smtp_fleet)
+        # One reusable SMTP connection per inbox, so each inbox pays the
+        # connect + STARTTLS + AUTH cost once per run instead of per email
+        smtp_sessions = [SmtpSession(conf) for conf in smtp_fleet]
+        # Sender address and persona per inbox, resolved once up front
+        inbox_from_emails = [conf.get("email", conf.get("user", "unknown")) for conf in smtp_fleet]
+        inbox_personas = [get_persona_for_email(from_email) for from_email in inbox_from_emails]
         # Current inbox index for round-robin rotation
         smtp_index = 0
+        # Loop-invariant limits and running send total as locals; stats["sent"]
+        # is kept in sync on each successful send
+        daily_limit = DAILY_LIMIT
+        per_inbox_limit = PER_INBOX_LIMIT
+        fleet_size = len(smtp_fleet)
+        sent_total = 0
+
+        try:
+            for lead in leads:
+                # Check global daily limit
+                if sent_total >= daily_limit:
+                    logger.info("Hit global daily limit. Stopping email sending.")
+                    break
 
-        for lead in leads:
-            # Check global daily limit
-            if stats["sent"] >= DAILY_LIMIT:
-                logger.info("Hit global daily limit. Stopping email sending.")
-                break
-
-            # Get email list
-            email_list = lead.get("emails") or []
-            if not email_list:
-                stats["skipped"] += 1
-                logger.debug(f"Skipping lead {lead.get('domain')} - no emails")
-                continue
-
-            # Find an available inbox (round-robin, respecting per-inbox limit)
-            attempts = 0
-            while attempts < len(smtp_fleet):
-                if inbox_send_counts[smtp_index] < PER_INBOX_LIMIT:
+                # Get email list
+                email_list = lead.get("emails") or []
+                if not email_list:
+                    stats["skipped"] += 1
+                    logger.debug(f"Skipping lead {lead.get('domain')} - no emails")
+                    continue
+
+                # Pick first valid email
+                recipient = email_list[0]
+                if recipient.lower() in sent_recipients:
+                    stats["skipped"] += 1
+                    logger.debug(f"Skipping lead {lead.get('domain')} - {recipient} already emailed")
+                    try:
+                        mark_lead_skipped(supabase, lead.get("id"))
+                    except Exception as e:
+                        logger.warning(f"Could not mark lead {lead.get('domain')} as skipped: {e}")
+                    continue
+
+                # Find an available inbox (round-robin, respecting per-inbox limit)
+                attempts = 0
+                while attempts < fleet_size:
+                    if inbox_send_counts[smtp_index] < per_inbox_limit:
+                        break
+                    smtp_index = (smtp_index + 1) % fleet_size
+                    attempts += 1
+
+                # If all inboxes have hit their limit, stop
+                if attempts >= fleet_size:
+                    logger.info("All inboxes have reached their per-inbox limit. Stopping.")
                     break
-                smtp_index = (smtp_index + 1) % len(smtp_fleet)
-                attempts += 1
-            
-            # If all inboxes have hit their limit, stop
-            if attempts >= len(smtp_fleet):
-                logger.info("All inboxes have reached their per-inbox limit. Stopping.")
-                break
 
-            smtp_conf = smtp_fleet[smtp_index]
-            from_email = smtp_conf.get("email", smtp_conf.get("user", "unknown"))
-            masked_inbox = from_email[:3] + "***" + from_email[from_email.find("@"):] if "@" in from_email else from_email[:3] + "***"
-            
-            # Get persona for this inbox
-            persona = get_persona_for_email(from_email)
-
-            # Pick first valid email
-            recipient = email_list[0]
-            domain = lead.get("domain", "your website")
-            lead_id = lead.get("id")
-            
-            # Get technologies from the lead (for persona-based email generation)
-            # Try different possible field names for technologies
-            technologies = (
-                lead.get("technologies") or 
-                lead.get("scored_technologies") or 
-                []
-            )
-            
-            # Extract tech names if they're dicts
-            if technologies and isinstance(technologies[0], dict):
-                technologies = [t.get("name", str(t)) for t in technologies]
-            
-            # Get top_technology as main tech if available
-            top_tech = lead.get("top_technology")
-            main_tech = None
-            if top_tech:
-                if isinstance(top_tech, dict):
-                    main_tech = top_tech.get("name")
-                elif isinstance(top_tech, str):
-                    main_tech = top_tech
-            
-            # If no main_tech but we have technologies, use first one
-            if not main_tech and technologies:
-                main_tech = technologies[0]
-            
-            # Generate persona-based email
-            email_data = None
-            if main_tech:
-                email_data = generate_outreach_email_with_persona(
-                    domain=domain,
-                    technologies=technologies if technologies else [main_tech],
-                    from_email=from_email,
+                smtp_conf = smtp_fleet[smtp_index]
+                from_email = inbox_from_emails[smtp_index]
+                masked_inbox = smtp_conf["masked_email"]
+                persona = inbox_personas[smtp_index]
+
+                domain = lead.get("domain", "your website")
+                lead_id = lead.get("id")
+
+                # Get technologies from the lead (for persona-based email generation)
+                # Try different possible field names for technologies
+                technologies = (
+                    lead.get("technologies") or 
+                    lead.get("scored_technologies") or 
+                    []
                 )
-            
-            if email_data:
-                subject = email_data["subject"]
-                body = email_data["body"]
-                variant_id = email_data.get("variant_id", "unknown")
-            else:
-                # Fallback to simple email if no tech data
-                subject = f"Quick question about {domain}"
-                body = f"""Hi — I'm {persona['name']} from CloseSpark in {CLOSESPARK_PROFILE['location']}.
+
+                # Extract tech names if they're dicts
+                if technologies and isinstance(technologies[0], dict):
+                    technologies = [t.get("name", str(t)) for t in technologies]
+
+                # Get top_technology as main tech if available
+                top_tech = lead.get("top_technology")
+                main_tech = None
+                if top_tech:
+                    if isinstance(top_tech, dict):
+                        main_tech = top_tech.get("name")
+                    elif isinstance(top_tech, str):
+                        main_tech = top_tech
+
+                # If no main_tech but we have technologies, use first one
+                if not main_tech and technologies:
+                    main_tech = technologies[0]
+
+                # Generate persona-based email
+                email_data = None
+                if main_tech:
+                    email_data = generate_outreach_email_with_persona(
+                        domain=domain,
+                        technologies=technologies if technologies else [main_tech],
+                        from_email=from_email,
+                    )
+
+                if email_data:
+                    subject = email_data["subject"]
+                    body = email_data["body"]
+                    variant_id = email_data.get("variant_id", "unknown")
+                else:
+                    # Fallback to simple email if no tech data
+                    subject = f"Quick question about {domain}"
+                    body = f"""Hi — I'm {persona['name']} from CloseSpark in {CLOSESPARK_PROFILE['location']}.
 
 I came across {domain} and wanted to reach out. I specialize in short-term technical fixes for web stacks — integration issues, automation gaps, and tracking problems.
 
@@ -474,45 +659,50 @@ If it would help to have a specialist jump in, you can grab time here:
 – {persona['name']}
 {persona['role']}, CloseSpark
 {CLOSESPARK_PROFILE['github']}"""
-                variant_id = "fallback"
-
-            try:
-                email_start_time = time.time()
-                success = send_email_smtp(
-                    smtp_conf,
-                    to_email=recipient,
-                    subject=subject,
-                    body=body,
-                )
-                email_elapsed = time.time() - email_start_time
-
-                if success:
-                    logger.info(f"✓ [{stats['sent']+1}] Sent via {masked_inbox} to {recipient} (domain: {domain}, variant: {variant_id}) [{email_elapsed:.1f}s]")
-                    mark_lead_emailed(supabase, lead_id)
-                    stats["sent"] += 1
-                    inbox_send_counts[smtp_index] += 1
-                    # Rotate to next inbox only on success (round-robin)
-                    smtp_index = (smtp_index + 1) % len(smtp_fleet)
-                else:
-                    logger.warning(f"✗ Failed to send via {masked_inbox} to {recipient} (domain: {domain})")
+                    variant_id = "fallback"
+
+                try:
+                    email_start_time = time.time()
+                    success = send_email_smtp(
+                        smtp_conf,
+                        to_email=recipient,
+                        subject=subject,
+                        body=body,
+                        session=smtp_sessions[smtp_index],
+                    )
+                    email_elapsed = time.time() - email_start_time
+
+                    if success:
+                        logger.info(f"✓ [{sent_total+1}] Sent via {masked_inbox} to {recipient} (domain: {domain}, variant: {variant_id}) [{email_elapsed:.1f}s]")
+                        mark_lead_emailed(supabase, lead_id)
+                        sent_recipients.add(recipient.lower())
+                        sent_total += 1
+                        stats["sent"] = sent_total
+                        inbox_send_counts[smtp_index] += 1
+                        # Rotate to next inbox only on success (round-robin)
+                        smtp_index = (smtp_index + 1) % fleet_size
+                    else:
+                        logger.warning(f"✗ Failed to send via {masked_inbox} to {recipient} (domain: {domain})")
+                        stats["failed"] += 1
+
+                except Exception as e:
+                    logger.error(f"✗ Error sending via {masked_inbox} to {recipient}: {e}")
                     stats["failed"] += 1
 
-            except Exception as e:
-                logger.error(f"✗ Error sending via {masked_inbox} to {recipient}: {e}")
-                stats["failed"] += 1
-
-            # Throttle to prevent rate limiting
-            if stats["sent"] < DAILY_LIMIT:
-                logger.debug(f"Waiting {SEND_DELAY} seconds before next email...")
-                time.sleep(SEND_DELAY)
+                # Throttle to prevent rate limiting
+                if sent_total < daily_limit:
+                    logger.debug(f"Waiting {SEND_DELAY} seconds before next email...")
+                    time.sleep(SEND_DELAY)
+        finally:
+            # Always QUIT the inbox connections, even if the send loop raised
+            for session in smtp_sessions:
+                session.close()
 
         # Log per-inbox summary
         logger.info("-" * 60)
         logger.info("INBOX SUMMARY:")
         for i, smtp_conf in enumerate(smtp_fleet):
-            from_email = smtp_conf.get("email", smtp_conf.get("user", "unknown"))
-            masked_inbox = from_email[:3] + "***" + from_email[from_email.find("@"):] if "@" in from_email else from_email[:3] + "***"
-            logger.info(f"  Inbox {i+1} ({masked_inbox}): {inbox_send_counts[i]} emails sent")
+            logger.info(f"  Inbox {i+1} ({smtp_conf['masked_email']}): {inbox_send_counts[i]} emails sent")
 
         # Print summary
         outreach_elapsed = time.time() - outreach_start_time
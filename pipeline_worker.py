@@ -22,25 +22,53 @@ Environment Variables Required:
 Optional Environment Variables:
     SUPABASE_TABLE: Table for scan results (default: tech_scans)
     SUPABASE_DOMAIN_TABLE: Table for domain tracking (default: domains_seen)
+    SUPABASE_NEW_DOMAINS_RPC: Postgres function that returns the unseen subset
+        of a domain list (default: unset, dedup uses a SELECT instead)
+    SUPABASE_INSERT_DOMAINS_RPC: Postgres function that inserts domains and
+        returns only the newly inserted ones (default: unset)
     APIFY_ACTOR: Apify actor ID (default: compass/crawler-google-places)
     APIFY_MAX_PLACES: Max places to crawl per search (default: 1000)
     APIFY_POLL_INTERVAL: Seconds between Apify run status polls (default: 30)
     APIFY_RUN_TIMEOUT: Maximum seconds to wait for Apify run (default: 3600)
     CATEGORIES_FILE: Path to categories JSON (default: config/categories-250.json)
     SCANNER_DISABLE_EMAIL_GENERATION: Set to 'true' to skip email generation
+    SCAN_CONCURRENCY: Number of domains scanned in parallel (default: 16)
+    SCAN_INSERT_BATCH_SIZE: Scan result rows per Supabase insert (default: 500)
+    SCAN_INSERT_CONCURRENCY: Scan result batches inserted in parallel (default: 4)
+    SCAN_FLUSH_EVERY: Flush buffered scan results after this many completed
+        scans, even if the insert batch isn't full (default: 100)
+    SCAN_FLUSH_INTERVAL: Flush buffered scan results at least this often,
+        in seconds (default: 30)
     CATEGORY_OVERRIDE: Override the daily category selection
     LOG_LEVEL: Logging level (default: INFO)
+    LOG_BUFFER_SIZE: Buffer this many log records between stdout writes
+        (default: 0, every record is written immediately)
 """
 
+import atexit
 import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
+import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
+from functools import lru_cache
+from types import MappingProxyType
 
+import httpx
 from apify_client import ApifyClient
-from supabase import create_client
+from postgrest import ReturnMethod
+from supabase import ClientOptions, create_client
+
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used otherwise
+    orjson = None  # type: ignore
 
 from prospectpilot import scan_technologies
 
@@ -61,14 +89,40 @@ def setup_logging():
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level, logging.INFO))
     
-    # Clear existing handlers
+    # Clear existing handlers, stopping any background listener we started
+    for handler in root_logger.handlers:
+        listener = getattr(handler, "listener", None)
+        if listener is not None:
+            atexit.unregister(listener.stop)
+            listener.stop()
+            for target in listener.handlers:
+                target.flush()
     root_logger.handlers.clear()
     
     # Add stdout handler (Render captures stdout)
     stdout_handler = logging.StreamHandler(sys.stdout)
     stdout_handler.setFormatter(formatter)
-    root_logger.addHandler(stdout_handler)
-    
+
+    # Optionally coalesce records into fewer writes; errors flush immediately
+    # and anything still buffered is flushed by logging.shutdown() at exit
+    buffer_size = int(os.getenv("LOG_BUFFER_SIZE", "0"))
+    output_handler = stdout_handler
+    if buffer_size > 0:
+        output_handler = logging.handlers.MemoryHandler(
+            capacity=buffer_size,
+            flushLevel=logging.ERROR,
+            target=stdout_handler,
+        )
+
+    # Scan threads only enqueue records; a background listener does the
+    # actual stdout writes so a slow log pipe never stalls the pipeline
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.listener = logging.handlers.QueueListener(queue_handler.queue, output_handler)
+    queue_handler.listener.start()
+    # Drain the queue on exit (runs before logging's own shutdown flush)
+    atexit.register(queue_handler.listener.stop)
+    root_logger.addHandler(queue_handler)
+
     return logging.getLogger("pipeline")
 
 
@@ -83,6 +137,16 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 SUPABASE_TABLE = os.getenv("SUPABASE_TABLE", "tech_scans")
 SUPABASE_DOMAIN_TABLE = os.getenv("SUPABASE_DOMAIN_TABLE", "domains_seen")
 SUPABASE_CATEGORIES_TABLE = os.getenv("SUPABASE_CATEGORIES_TABLE", "categories_used")
+SUPABASE_NEW_DOMAINS_RPC = os.getenv("SUPABASE_NEW_DOMAINS_RPC", "")
+SUPABASE_INSERT_DOMAINS_RPC = os.getenv("SUPABASE_INSERT_DOMAINS_RPC", "")
+
+# Domains per .in_() lookup; keeps the PostgREST GET URL well under ~8KB
+DOMAIN_LOOKUP_CHUNK_SIZE = 100
+# Lookup chunks probed in parallel
+DOMAIN_LOOKUP_CONCURRENCY = 8
+# Rows per domains table upsert, and how many upserts run at once
+DOMAIN_UPSERT_BATCH_SIZE = 500
+DOMAIN_UPSERT_CONCURRENCY = 4
 
 APIFY_TOKEN = os.getenv("APIFY_TOKEN")
 APIFY_ACTOR = os.getenv("APIFY_ACTOR", "compass/crawler-google-places")
@@ -92,11 +156,24 @@ APIFY_RUN_TIMEOUT = int(os.getenv("APIFY_RUN_TIMEOUT", "3600"))  # seconds (1 ho
 
 CATEGORIES_FILE = os.getenv("CATEGORIES_FILE", "config/categories-250.json")
 SCANNER_DISABLE_EMAIL_GENERATION = os.getenv("SCANNER_DISABLE_EMAIL_GENERATION", "false").lower() == "true"
+# Scans are network-bound (page fetches + email crawl), so they overlap well in threads
+SCAN_CONCURRENCY = max(1, int(os.getenv("SCAN_CONCURRENCY", "16")))
+# Results are buffered and inserted in batches instead of one request per domain
+SCAN_INSERT_BATCH_SIZE = max(1, int(os.getenv("SCAN_INSERT_BATCH_SIZE", "500")))
+# Batches are uploaded in the background so inserts overlap with scanning
+SCAN_INSERT_CONCURRENCY = max(1, int(os.getenv("SCAN_INSERT_CONCURRENCY", "4")))
+# mark_domains_seen runs on a background thread alongside the scans, so a
+# killed worker can leave domains recorded as seen while their buffered
+# results were never saved; these bound how much a crash can drop
+SCAN_FLUSH_EVERY = max(1, int(os.getenv("SCAN_FLUSH_EVERY", "100")))
+SCAN_FLUSH_INTERVAL = float(os.getenv("SCAN_FLUSH_INTERVAL", "30"))  # seconds
 
 # Category rotation settings
 # CATEGORY_COOLDOWN_DAYS: Number of days before a category can be reused
 # Set to 0 to disable cooldown and allow immediate reuse
 CATEGORY_COOLDOWN_DAYS = int(os.getenv("CATEGORY_COOLDOWN_DAYS", "7"))
+# CATEGORY_OVERRIDE: Force a specific category instead of the daily rotation
+CATEGORY_OVERRIDE = os.getenv("CATEGORY_OVERRIDE")
 
 
 def log_config():
@@ -109,6 +186,8 @@ def log_config():
     logger.info(f"  SUPABASE_TABLE: {SUPABASE_TABLE}")
     logger.info(f"  SUPABASE_DOMAIN_TABLE: {SUPABASE_DOMAIN_TABLE}")
     logger.info(f"  SUPABASE_CATEGORIES_TABLE: {SUPABASE_CATEGORIES_TABLE}")
+    logger.info(f"  SUPABASE_NEW_DOMAINS_RPC: {SUPABASE_NEW_DOMAINS_RPC or '[NOT SET]'}")
+    logger.info(f"  SUPABASE_INSERT_DOMAINS_RPC: {SUPABASE_INSERT_DOMAINS_RPC or '[NOT SET]'}")
     logger.info(f"  APIFY_TOKEN: {'[SET]' if APIFY_TOKEN else '[NOT SET]'}")
     logger.info(f"  APIFY_ACTOR: {APIFY_ACTOR}")
     logger.info(f"  APIFY_MAX_PLACES: {APIFY_MAX_PLACES}")
@@ -116,25 +195,52 @@ def log_config():
     logger.info(f"  APIFY_RUN_TIMEOUT: {APIFY_RUN_TIMEOUT} seconds")
     logger.info(f"  CATEGORIES_FILE: {CATEGORIES_FILE}")
     logger.info(f"  CATEGORY_COOLDOWN_DAYS: {CATEGORY_COOLDOWN_DAYS}")
+    logger.info(f"  CATEGORY_OVERRIDE: {CATEGORY_OVERRIDE or '[NOT SET]'}")
     logger.info(f"  SCANNER_DISABLE_EMAIL_GENERATION: {SCANNER_DISABLE_EMAIL_GENERATION}")
+    logger.info(f"  SCAN_CONCURRENCY: {SCAN_CONCURRENCY}")
+    logger.info(f"  SCAN_INSERT_BATCH_SIZE: {SCAN_INSERT_BATCH_SIZE}")
+    logger.info(f"  SCAN_INSERT_CONCURRENCY: {SCAN_INSERT_CONCURRENCY}")
+    logger.info(f"  SCAN_FLUSH_EVERY: {SCAN_FLUSH_EVERY}")
+    logger.info(f"  SCAN_FLUSH_INTERVAL: {SCAN_FLUSH_INTERVAL} seconds")
     logger.info("=" * 60)
 
 
+@lru_cache(maxsize=1)
 def get_supabase_client():
-    """Create and return a Supabase client."""
+    """
+    Create and return a Supabase client.
+
+    The client is built on one long-lived httpx client with keep-alive and
+    HTTP/2 enabled, so the dedup lookups and batched scan inserts share a
+    connection pool instead of handshaking with Supabase per request.
+    Connection-level failures are retried by the transport. The client is
+    cached per process, so repeat calls reuse the same pool.
+    """
     logger.info("Initializing Supabase client...")
     if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
         logger.error("Missing required environment variables: SUPABASE_URL and/or SUPABASE_SERVICE_KEY")
         raise ValueError(
             "SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables are required"
         )
-    client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    # http2/limits must live on the transport when one is passed explicitly
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0),
+    )
+    http_client = httpx.Client(transport=transport, timeout=httpx.Timeout(120.0))
+    client = create_client(
+        SUPABASE_URL,
+        SUPABASE_SERVICE_KEY,
+        options=ClientOptions(httpx_client=http_client),
+    )
     logger.info("Supabase client initialized successfully")
     return client
 
 
+@lru_cache(maxsize=1)
 def get_apify_client():
-    """Create and return an Apify client."""
+    """Create and return an Apify client (cached per process)."""
     logger.info("Initializing Apify client...")
     if not APIFY_TOKEN:
         logger.error("Missing required environment variable: APIFY_TOKEN")
@@ -147,18 +253,33 @@ def get_apify_client():
 # ---------- CATEGORY SELECTION ----------
 
 
+@lru_cache(maxsize=None)
+def _read_categories_file(path: str) -> tuple[str, ...]:
+    """Read and parse a categories file once per process (keyed by path)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    # handle both parsers the same way
+    return tuple(orjson.loads(raw) if orjson else json.loads(raw))
+
+
 def load_categories() -> list[str]:
-    """Load categories from the JSON config file."""
+    """
+    Load categories from the JSON config file.
+
+    The file is parsed once per process and cached, so repeated calls (e.g.
+    when the worker is driven as a library or retried) skip the disk read
+    and JSON decode. Each call returns a fresh list.
+    """
     logger.info(f"Loading categories from: {CATEGORIES_FILE}")
     try:
-        with open(CATEGORIES_FILE, "r", encoding="utf-8") as f:
-            categories = json.load(f)
-            if not categories:
-                logger.error("Categories file is empty")
-                raise ValueError("Categories file is empty")
-            logger.info(f"Loaded {len(categories)} categories successfully")
-            logger.debug(f"First 5 categories: {categories[:5]}")
-            return categories
+        categories = list(_read_categories_file(CATEGORIES_FILE))
+        if not categories:
+            logger.error("Categories file is empty")
+            raise ValueError("Categories file is empty")
+        logger.info(f"Loaded {len(categories)} categories successfully")
+        logger.debug(f"First 5 categories: {categories[:5]}")
+        return categories
     except FileNotFoundError:
         logger.error(f"Categories file not found: {CATEGORIES_FILE}")
         raise FileNotFoundError(
@@ -242,7 +363,7 @@ def record_category_used(
             "domains_new": domains_new,
         }
         supabase.table(SUPABASE_CATEGORIES_TABLE).upsert(
-            row, on_conflict="category,used_date"
+            row, on_conflict="category,used_date", returning=ReturnMethod.minimal
         ).execute()
         logger.info(f"Category usage recorded: {category} on {today}")
     except Exception as e:
@@ -250,7 +371,21 @@ def record_category_used(
         logger.warning(f"Could not record category usage: {e}")
 
 
-def pick_today_category(categories: list[str], supabase=None) -> str:
+def pick_category_for_date(day: date, categories: list[str]) -> tuple[str, int]:
+    """
+    Return the deterministic rotation category for a given date.
+
+    Pure function of the date, so catch-up runs can compute past days'
+    categories without touching the clock or Supabase.
+
+    Returns:
+        Tuple of (category, its index in categories)
+    """
+    idx = day.toordinal() % len(categories)
+    return categories[idx], idx
+
+
+def pick_today_category(categories: list[str], supabase=None) -> tuple[str, int]:
     """
     Select today's category with cooldown enforcement.
 
@@ -268,23 +403,26 @@ def pick_today_category(categories: list[str], supabase=None) -> str:
         supabase: Optional Supabase client for cooldown checking
 
     Returns:
-        Today's category string
+        Tuple of (today's category, its index in categories). The index is
+        -1 when CATEGORY_OVERRIDE names a category not in the list.
     """
     # Check for manual override first
-    override = os.getenv("CATEGORY_OVERRIDE")
+    override = CATEGORY_OVERRIDE
     if override:
         logger.info(f"Using CATEGORY_OVERRIDE environment variable: {override}")
-        return override
+        try:
+            return override, categories.index(override)
+        except ValueError:
+            return override, -1
 
     # Calculate deterministic starting index
-    start_idx = date.today().toordinal() % len(categories)
-    deterministic_category = categories[start_idx]
+    deterministic_category, start_idx = pick_category_for_date(date.today(), categories)
     logger.info(f"Deterministic category index {start_idx} of {len(categories)}: '{deterministic_category}'")
 
     # If cooldown is disabled or no Supabase client, use deterministic category
     if CATEGORY_COOLDOWN_DAYS <= 0 or supabase is None:
         logger.info("Category cooldown disabled, using deterministic selection")
-        return deterministic_category
+        return deterministic_category, start_idx
 
     # Get recently used categories
     recently_used = get_recently_used_categories(supabase, CATEGORY_COOLDOWN_DAYS)
@@ -292,12 +430,12 @@ def pick_today_category(categories: list[str], supabase=None) -> str:
     # If no categories were used recently, use deterministic
     if not recently_used:
         logger.info("No recently used categories found, using deterministic selection")
-        return deterministic_category
+        return deterministic_category, start_idx
 
     # If deterministic category wasn't used recently, use it
     if deterministic_category not in recently_used:
         logger.info(f"Deterministic category '{deterministic_category}' not in cooldown, using it")
-        return deterministic_category
+        return deterministic_category, start_idx
 
     # Find the first unused category starting from the deterministic index
     logger.info(f"Deterministic category '{deterministic_category}' is in cooldown, finding alternative...")
@@ -306,18 +444,95 @@ def pick_today_category(categories: list[str], supabase=None) -> str:
         candidate = categories[idx]
         if candidate not in recently_used:
             logger.info(f"Selected alternative category index {idx}: '{candidate}'")
-            return candidate
+            return candidate, idx
 
     # All categories were used recently, fall back to deterministic
     logger.warning(f"All {len(categories)} categories used within cooldown period!")
     logger.warning(f"Falling back to deterministic category: '{deterministic_category}'")
-    return deterministic_category
+    return deterministic_category, start_idx
 
 
 # ---------- APIFY / GOOGLE PLACES SCRAPE ----------
 
-# Terminal statuses for Apify runs
-APIFY_TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "TIMED-OUT", "ABORTED"}
+def _apify_run_succeeded(run_info: dict) -> None:
+    """Handle a SUCCEEDED run; returns None since there is nothing to raise."""
+    return None
+
+
+def _apify_run_failed(run_info: dict) -> RuntimeError:
+    """Handle a FAILED run; returns the RuntimeError to raise."""
+    error_msg = run_info.get("statusMessage", "Unknown error")
+    logger.error(f"Apify run failed: {error_msg}")
+    return RuntimeError(f"Apify run failed: {error_msg}")
+
+
+def _apify_run_timed_out(run_info: dict) -> RuntimeError:
+    """Handle a TIMED-OUT run; returns the RuntimeError to raise."""
+    logger.error("Apify run timed out on the server side")
+    return RuntimeError("Apify run timed out on the server side")
+
+
+def _apify_run_aborted(run_info: dict) -> RuntimeError:
+    """Handle an ABORTED run; returns the RuntimeError to raise."""
+    logger.error("Apify run was aborted")
+    return RuntimeError("Apify run was aborted")
+
+
+# Terminal statuses for Apify runs, mapped to a handler that returns the
+# error to raise (None means the run succeeded)
+_APIFY_TERMINAL_HANDLERS = {
+    "SUCCEEDED": _apify_run_succeeded,
+    "FAILED": _apify_run_failed,
+    "TIMED-OUT": _apify_run_timed_out,
+    "ABORTED": _apify_run_aborted,
+}
+APIFY_TERMINAL_STATUSES = frozenset(_APIFY_TERMINAL_HANDLERS)
+
+# Fixed Apify actor input; only the search string and place cap vary per run
+_APIFY_PAYLOAD_TEMPLATE = MappingProxyType({
+    "countryCode": "us",
+    "includeWebResults": True,
+    "language": "en",
+    "maxImages": 0,
+    "maxQuestions": 0,
+    "scrapeContacts": False,
+    "scrapeDirectories": False,
+    "scrapeImageAuthors": False,
+    "scrapePlaceDetailPage": False,
+    "scrapeReviewsPersonalData": False,
+    "scrapeTableReservationProvider": False,
+    "skipClosedPlaces": True,
+    "website": "withWebsite",
+    "searchMatching": "all",
+    "placeMinimumStars": "",
+    "maximumLeadsEnrichmentRecords": 0,
+    "maxReviews": 0,
+    "reviewsSort": "newest",
+    "reviewsFilterString": "",
+    "reviewsOrigin": "all",
+    "allPlacesNoSearchAction": "",
+})
+
+# Host part of a website URL: optional scheme, optional userinfo, optional www.,
+# then everything up to the first path/port/query/fragment delimiter
+_DOMAIN_RE = re.compile(
+    r"^\s*(?:https?:)?(?://)?(?:[^@/?#\s]*@)?(?:www\.)?(?!https?:)([^/:?#\s]+)",
+    re.IGNORECASE,
+)
+
+
+def _normalize_domain(url: str) -> str:
+    """
+    Normalize a website URL to a bare lowercase domain.
+
+    Strips the scheme, userinfo, www. prefix, port, path, query and fragment,
+    e.g. 'HTTPS://www.Example.com:8080/contact' -> 'example.com'.
+
+    Returns:
+        The normalized domain, or an empty string if none could be extracted
+    """
+    match = _DOMAIN_RE.match(url)
+    return match.group(1).lower() if match else ""
 
 
 def get_domains_from_category(apify_client: ApifyClient, category: str) -> list[str]:
@@ -343,28 +558,8 @@ def get_domains_from_category(apify_client: ApifyClient, category: str) -> list[
     logger.info(f"Starting Google Places scrape for category: '{category}'")
 
     payload = {
-        "countryCode": "us",
-        "includeWebResults": True,
-        "language": "en",
-        "maxImages": 0,
-        "maxQuestions": 0,
-        "scrapeContacts": False,
-        "scrapeDirectories": False,
-        "scrapeImageAuthors": False,
-        "scrapePlaceDetailPage": False,
-        "scrapeReviewsPersonalData": False,
-        "scrapeTableReservationProvider": False,
+        **_APIFY_PAYLOAD_TEMPLATE,
         "searchStringsArray": [category],
-        "skipClosedPlaces": True,
-        "website": "withWebsite",
-        "searchMatching": "all",
-        "placeMinimumStars": "",
-        "maximumLeadsEnrichmentRecords": 0,
-        "maxReviews": 0,
-        "reviewsSort": "newest",
-        "reviewsFilterString": "",
-        "reviewsOrigin": "all",
-        "allPlacesNoSearchAction": "",
         "maxCrawledPlacesPerSearch": APIFY_MAX_PLACES,
     }
 
@@ -386,8 +581,12 @@ def get_domains_from_category(apify_client: ApifyClient, category: str) -> list[
     logger.info(f"  Status: {run.get('status')}")
     logger.info("Waiting for run to complete... (polling for status)")
 
-    # Poll for run completion
+    # Poll for run completion. wait_for_finish is a server-side long poll
+    # that returns as soon as the run finishes, so the poll interval only
+    # bounds how often progress is logged; failed polls back off exponentially
+    # with jitter
     poll_count = 0
+    retry_delay = 2.0
     while True:
         elapsed = time.time() - start_time
 
@@ -404,15 +603,20 @@ def get_domains_from_category(apify_client: ApifyClient, category: str) -> list[
                 f"Apify run timed out after {APIFY_RUN_TIMEOUT} seconds"
             )
 
-        # Wait for the next poll interval (capped at 60s to ensure timely status updates)
-        wait_time = min(APIFY_POLL_INTERVAL, 60)
+        # Wait for the next poll interval (capped at 60s to ensure timely
+        # status updates, and never past the overall run timeout)
+        wait_time = max(1, int(min(APIFY_POLL_INTERVAL, 60, APIFY_RUN_TIMEOUT - elapsed)))
         run_info = apify_client.run(run_id).wait_for_finish(wait_secs=wait_time)
         poll_count += 1
 
         if run_info is None:
-            logger.warning(f"Failed to get run info, retrying...")
-            time.sleep(5)
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            delay = random.uniform(0, retry_delay)
+            logger.warning(f"Failed to get run info, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            retry_delay = min(retry_delay * 2, 60.0)
             continue
+        retry_delay = 2.0
 
         status = run_info.get("status", "UNKNOWN")
         status_message = run_info.get("statusMessage", "")
@@ -423,64 +627,41 @@ def get_domains_from_category(apify_client: ApifyClient, category: str) -> list[
         )
 
         # Check if run is complete
-        if status in APIFY_TERMINAL_STATUSES:
-            if status == "SUCCEEDED":
-                logger.info(f"Apify run completed successfully in {elapsed:.1f} seconds")
-                break
-            elif status == "FAILED":
-                error_msg = run_info.get("statusMessage", "Unknown error")
-                logger.error(f"Apify run failed: {error_msg}")
-                raise RuntimeError(f"Apify run failed: {error_msg}")
-            elif status == "TIMED-OUT":
-                logger.error("Apify run timed out on the server side")
-                raise RuntimeError("Apify run timed out on the server side")
-            elif status == "ABORTED":
-                logger.error("Apify run was aborted")
-                raise RuntimeError("Apify run was aborted")
+        handler = _APIFY_TERMINAL_HANDLERS.get(status)
+        if handler is not None:
+            error = handler(run_info)
+            if error is not None:
+                raise error
+            logger.info(f"Apify run completed successfully in {elapsed:.1f} seconds")
+            break
 
     elapsed = time.time() - start_time
     logger.info(f"Total run time: {elapsed:.1f} seconds")
     logger.info(f"Total poll requests: {poll_count}")
 
-    # Fetch dataset items
-    logger.info("Fetching dataset items...")
-    dataset_items = list(
-        apify_client.dataset(dataset_id).iterate_items()
-    )
-
-    logger.info(f"Retrieved {len(dataset_items)} places from Google Places")
-
-    # Extract domains
-    logger.info("Extracting and normalizing domains...")
-    domains = []
-    domains_without_website = 0
-    
-    for item in dataset_items:
-        url = item.get("website")
-        if not url:
-            domains_without_website += 1
-            continue
-        # Normalize domain
-        url = url.replace("https://", "").replace("http://", "")
-        url = url.split("/")[0].strip().lower()
-        # Remove www. prefix
-        if url.startswith("www."):
-            url = url[4:]
-        if url:
-            domains.append(url)
-
+    # Stream dataset items and keep only the extracted domains, so the full
+    # place records are never held in memory together
+    logger.info("Fetching dataset items and extracting domains...")
+    # Only the website field is used; project server-side so reviews, photos
+    # and opening hours never cross the wire
+    websites = [
+        item.get("website")
+        for item in apify_client.dataset(dataset_id).iterate_items(fields=["website"])
+    ]
+    places_count = len(websites)
+    urls = list(filter(None, websites))
+    domains_without_website = places_count - len(urls)
+    domains = list(filter(None, map(_normalize_domain, urls)))
+
+    domains_count = len(domains)
+    # Order-preserving dedup in a single C-level pass
+    unique_domains = list(dict.fromkeys(domains))
+
+    logger.info(f"Retrieved {places_count} places from Google Places")
     logger.info(f"Places without website: {domains_without_website}")
-    logger.info(f"Places with website: {len(domains)}")
-
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_domains = []
-    for d in domains:
-        if d not in seen:
-            seen.add(d)
-            unique_domains.append(d)
+    logger.info(f"Places with website: {domains_count}")
 
-    duplicates_removed = len(domains) - len(unique_domains)
+    duplicates_removed = domains_count - len(unique_domains)
     logger.info(f"Duplicate domains removed: {duplicates_removed}")
     logger.info(f"Unique domains extracted: {len(unique_domains)}")
     
@@ -493,9 +674,153 @@ def get_domains_from_category(apify_client: ApifyClient, category: str) -> list[
 # ---------- SUPABASE DEDUPING ----------
 
 
-def filter_new_domains(supabase, domains: list[str], category: str) -> list[str]:
+def query_new_domains_rpc(supabase, domains: list[str]) -> list[str]:
     """
-    Filter out domains that have already been processed.
+    Ask Postgres which domains are not yet in the domains table.
+
+    The anti-join runs server-side, so the request carries the domain list
+    in a POST body (no URL length limit) and only unseen domains come back.
+    Expects a function like:
+
+        create or replace function new_domains(p_domains text[])
+        returns table (domain text) language sql stable as $$
+            select d from unnest(p_domains) as d
+            where not exists (select 1 from domains_seen ds where ds.domain = d)
+        $$;
+
+    Args:
+        supabase: Supabase client instance
+        domains: List of domain strings to check
+
+    Returns:
+        The unseen domains, in the order given
+    """
+    res = supabase.rpc(SUPABASE_NEW_DOMAINS_RPC, {"p_domains": domains}).execute()
+    unseen = {row["domain"] for row in (res.data or [])}
+    return [d for d in domains if d in unseen]
+
+
+def insert_new_domains_rpc(supabase, domains: list[str], category: str) -> list[str]:
+    """
+    Insert domains and get back only the ones that weren't already stored.
+
+    Lookup and insert collapse into one atomic statement, so there is a
+    single round trip and no window between the check and the write.
+    Expects a function like:
+
+        create or replace function insert_new_domains(p_rows jsonb)
+        returns setof text language sql as $$
+            insert into domains_seen (domain, category)
+            select r->>'domain', r->>'category'
+            from jsonb_array_elements(p_rows) as r
+            on conflict (domain) do nothing
+            returning domain
+        $$;
+
+    Args:
+        supabase: Supabase client instance
+        domains: List of domain strings to insert
+        category: Category the domains were scraped for
+
+    Returns:
+        The newly inserted domains, in the order given
+    """
+    rows = [{"domain": d, "category": category} for d in domains]
+    res = supabase.rpc(SUPABASE_INSERT_DOMAINS_RPC, {"p_rows": rows}).execute()
+    # setof text comes back as bare strings; tolerate table-shaped rows too
+    inserted = {row["domain"] if isinstance(row, dict) else row for row in (res.data or [])}
+    return [d for d in domains if d in inserted]
+
+
+def query_seen_domains(supabase, domains: list[str]) -> set[str]:
+    """
+    Look up which domains already exist in the domains table.
+
+    The .in_() filter is encoded into the request URL, so domains are
+    queried DOMAIN_LOOKUP_CHUNK_SIZE at a time to stay under PostgREST's
+    URL length limit (HTTP 414) on large scrapes. Chunks are independent
+    reads, so up to DOMAIN_LOOKUP_CONCURRENCY of them run in parallel.
+
+    Relies on a unique index on the domain column, which the
+    on_conflict="domain" upsert needs anyway and which lets Postgres answer
+    the lookup with an index-only scan:
+
+        create unique index concurrently if not exists domains_seen_domain_idx
+            on domains_seen (domain);
+
+    Args:
+        supabase: Supabase client instance
+        domains: List of domain strings to check
+
+    Returns:
+        Set of domains already present
+    """
+    chunks = [
+        domains[i:i + DOMAIN_LOOKUP_CHUNK_SIZE]
+        for i in range(0, len(domains), DOMAIN_LOOKUP_CHUNK_SIZE)
+    ]
+
+    table = supabase.table(SUPABASE_DOMAIN_TABLE)
+
+    def lookup(chunk):
+        res = table.select("domain").in_("domain", chunk).execute()
+        return res.data or []
+
+    seen = set()
+    if len(chunks) == 1:
+        seen.update(row["domain"] for row in lookup(chunks[0]))
+        return seen
+    with ThreadPoolExecutor(max_workers=min(DOMAIN_LOOKUP_CONCURRENCY, len(chunks))) as executor:
+        for rows in executor.map(lookup, chunks):
+            seen.update(row["domain"] for row in rows)
+    return seen
+
+
+def mark_domains_seen(supabase, domains: list[str], category: str) -> None:
+    """
+    Upsert domains into the domains table so later runs skip them.
+
+    Rows are sent DOMAIN_UPSERT_BATCH_SIZE at a time, with up to
+    DOMAIN_UPSERT_CONCURRENCY batches in flight.
+
+    Args:
+        supabase: Supabase client instance
+        domains: List of domain strings to record
+        category: The category the domains were found under
+    """
+    logger.info(f"Inserting {len(domains)} new domains into {SUPABASE_DOMAIN_TABLE}...")
+    start_time = time.time()
+    rows = [{"domain": d, "category": category} for d in domains]
+    batches = [
+        rows[i:i + DOMAIN_UPSERT_BATCH_SIZE]
+        for i in range(0, len(rows), DOMAIN_UPSERT_BATCH_SIZE)
+    ]
+
+    table = supabase.table(SUPABASE_DOMAIN_TABLE)
+
+    def upsert(batch):
+        table.upsert(
+            batch,
+            on_conflict="domain",
+            returning=ReturnMethod.minimal,
+        ).execute()
+
+    if len(batches) == 1:
+        upsert(batches[0])
+    else:
+        with ThreadPoolExecutor(max_workers=min(DOMAIN_UPSERT_CONCURRENCY, len(batches))) as executor:
+            list(executor.map(upsert, batches))
+    elapsed = time.time() - start_time
+    logger.info(f"Domain insertion completed in {elapsed:.2f} seconds")
+
+
+def find_new_domains(supabase, domains: list[str], category: str) -> tuple[list[str], bool]:
+    """
+    Work out which domains have not been processed yet.
+
+    When the insert RPC is configured the new domains are recorded in the
+    same statement; otherwise the caller must record them with
+    mark_domains_seen.
 
     Args:
         supabase: Supabase client instance
@@ -503,7 +828,7 @@ def filter_new_domains(supabase, domains: list[str], category: str) -> list[str]
         category: The current category being processed
 
     Returns:
-        List of new (not previously seen) domain strings
+        Tuple of (new domain strings, whether they are already recorded)
     """
     logger.info("=" * 60)
     logger.info("STEP: DOMAIN DEDUPLICATION")
@@ -511,41 +836,61 @@ def filter_new_domains(supabase, domains: list[str], category: str) -> list[str]
     
     if not domains:
         logger.warning("No domains provided for deduplication")
-        return []
+        return [], False
 
     logger.info(f"Checking {len(domains)} domains against Supabase table: {SUPABASE_DOMAIN_TABLE}")
     
-    # Single roundtrip: check which exist
+    # Prefer letting Postgres insert-and-return the unseen domains in one
+    # statement, then a server-side anti-join, then SELECT + local diff
     logger.info("Querying Supabase for existing domains...")
     start_time = time.time()
-    res = (
-        supabase.table(SUPABASE_DOMAIN_TABLE)
-        .select("domain")
-        .in_("domain", domains)
-        .execute()
-    )
+    new_domains = None
+    inserted = False
+    if SUPABASE_INSERT_DOMAINS_RPC:
+        try:
+            new_domains = insert_new_domains_rpc(supabase, domains, category)
+            inserted = True
+        except Exception as e:
+            logger.warning(f"RPC {SUPABASE_INSERT_DOMAINS_RPC} failed ({e}), falling back to lookup + upsert")
+    if new_domains is None and SUPABASE_NEW_DOMAINS_RPC:
+        try:
+            new_domains = query_new_domains_rpc(supabase, domains)
+        except Exception as e:
+            logger.warning(f"RPC {SUPABASE_NEW_DOMAINS_RPC} failed ({e}), falling back to SELECT")
+    if new_domains is None:
+        seen = query_seen_domains(supabase, domains)
+        new_domains = [d for d in domains if d not in seen]
     elapsed = time.time() - start_time
     logger.info(f"Supabase query completed in {elapsed:.2f} seconds")
 
-    seen = {row["domain"] for row in (res.data or [])}
-    new_domains = [d for d in domains if d not in seen]
-
-    logger.info(f"Domains already in database: {len(seen)}")
+    logger.info(f"Domains already in database: {len(domains) - len(new_domains)}")
     logger.info(f"New domains to process: {len(new_domains)}")
     
     if new_domains:
         logger.debug(f"Sample new domains (first 10): {new_domains[:10]}")
 
-    # Upsert new domains into domains_seen
-    if new_domains:
-        logger.info(f"Inserting {len(new_domains)} new domains into {SUPABASE_DOMAIN_TABLE}...")
-        rows = [{"domain": d, "category": category} for d in new_domains]
-        start_time = time.time()
-        supabase.table(SUPABASE_DOMAIN_TABLE).upsert(
-            rows, on_conflict="domain"
-        ).execute()
-        elapsed = time.time() - start_time
-        logger.info(f"Domain insertion completed in {elapsed:.2f} seconds")
+    return new_domains, inserted
+
+
+def filter_new_domains(supabase, domains: list[str], category: str) -> list[str]:
+    """
+    Filter out domains that have already been processed.
+
+    New domains are recorded in the domains table before returning.
+
+    Args:
+        supabase: Supabase client instance
+        domains: List of domain strings to check
+        category: The current category being processed
+
+    Returns:
+        List of new (not previously seen) domain strings
+    """
+    new_domains, recorded = find_new_domains(supabase, domains, category)
+
+    # Upsert new domains into domains_seen (already done by the insert RPC)
+    if new_domains and not recorded:
+        mark_domains_seen(supabase, new_domains, category)
 
     return new_domains
 
@@ -553,36 +898,98 @@ def filter_new_domains(supabase, domains: list[str], category: str) -> list[str]
 # ---------- TECHNOLOGY SCAN + SAVE ----------
 
 
-def save_scan_result(supabase, result: dict, category: str) -> None:
-    """
-    Save a technology scan result to Supabase.
+# Empty fields for a domain whose scan raised; tuples so every error row can
+# share the same instances safely (they serialize to JSON arrays)
+_SCAN_ERROR_DEFAULTS = {
+    "technologies": (),
+    "scored_technologies": (),
+    "top_technology": None,
+    "emails": (),
+}
 
-    Args:
-        supabase: Supabase client instance
-        result: Scan result dictionary from scan_technologies
-        category: The business category
-    """
-    # Get generated_email data if available
-    generated_email = result.get("generated_email")
-    
-    row = {
+
+def _build_scan_row(result: dict, category: str) -> dict:
+    """Build a tech_scans row from a scan result dictionary."""
+    return {
         "domain": result["domain"],
         "category": category,
         "technologies": result.get("technologies", []),
         "scored_technologies": result.get("scored_technologies", []),
         "top_technology": result.get("top_technology"),
         "emails": result.get("emails", []),
-        "generated_email": generated_email,
+        "generated_email": result.get("generated_email"),
         "error": result.get("error"),
     }
-    supabase.table(SUPABASE_TABLE).insert(row).execute()
-    logger.debug(f"Saved scan result for {result['domain']} to {SUPABASE_TABLE}")
+
+
+def save_scan_results(supabase, results: list[dict], category: str) -> int:
+    """
+    Save technology scan results to Supabase in batches.
+
+    Rows are inserted SCAN_INSERT_BATCH_SIZE at a time. If a batch insert
+    fails, that batch is retried row by row so a single bad row doesn't
+    lose the rest of the batch.
+
+    Args:
+        supabase: Supabase client instance
+        results: Scan result dictionaries from scan_technologies
+        category: The business category
+
+    Returns:
+        Number of rows saved
+    """
+    saved = 0
+    # Request builders are stateless, so one table reference serves every batch
+    table = supabase.table(SUPABASE_TABLE)
+    for i in range(0, len(results), SCAN_INSERT_BATCH_SIZE):
+        batch = results[i:i + SCAN_INSERT_BATCH_SIZE]
+        rows = [_build_scan_row(r, category) for r in batch]
+        try:
+            # Nothing reads the inserted rows back, so skip the response body
+            table.insert(rows, returning=ReturnMethod.minimal).execute()
+            saved += len(rows)
+            logger.debug(f"Saved batch of {len(rows)} scan results to {SUPABASE_TABLE}")
+        except Exception as e:
+            logger.warning(f"Batch insert of {len(rows)} rows failed ({e}), retrying row by row...")
+            for result, row in zip(batch, rows):
+                try:
+                    table.insert(row, returning=ReturnMethod.minimal).execute()
+                    saved += 1
+                except Exception as row_error:
+                    logger.error(f"  ✗ Could not save scan result for {result['domain']}: {row_error}")
+    return saved
+
+
+def _scan_one(domain: str, generate_email: bool = True) -> tuple:
+    """
+    Scan a single domain on a worker thread.
+
+    Exceptions are captured rather than raised so one failing domain
+    doesn't abort the rest of the batch.
+
+    Returns:
+        Tuple of (TechScanResult or None, exception or None, elapsed seconds)
+    """
+    start_time = time.time()
+    try:
+        result = scan_technologies(domain, generate_email=generate_email)
+        return result, None, time.time() - start_time
+    except Exception as e:
+        return None, e, time.time() - start_time
 
 
 def run_technology_scans(supabase, domains: list[str], category: str) -> list[dict]:
     """
     Run technology scans on all domains and save results.
 
+    Domains are scanned concurrently on a thread pool of SCAN_CONCURRENCY
+    workers; results are logged on the calling thread in completion order
+    and saved in batches of SCAN_INSERT_BATCH_SIZE rows. Buffered results
+    are also flushed every SCAN_FLUSH_EVERY completions or SCAN_FLUSH_INTERVAL
+    seconds, whichever comes first, so a killed worker loses only a bounded
+    amount of finished work. Batches are handed to a separate pool of
+    SCAN_INSERT_CONCURRENCY uploaders so inserts don't stall scanning.
+
     Args:
         supabase: Supabase client instance
         domains: List of domain strings to scan
@@ -594,71 +1001,100 @@ def run_technology_scans(supabase, domains: list[str], category: str) -> list[di
     logger.info("=" * 60)
     logger.info("STEP: TECHNOLOGY SCANNING")
     logger.info("=" * 60)
+    # Never scan the same domain twice in one run, even if a caller passes
+    # duplicates; domains_seen already prevents repeats across runs
+    domains = list(dict.fromkeys(domains))
     logger.info(f"Starting technology scans for {len(domains)} domains")
     logger.info(f"Email generation: {'DISABLED' if SCANNER_DISABLE_EMAIL_GENERATION else 'ENABLED'}")
+    logger.info(f"Concurrency: {SCAN_CONCURRENCY} parallel scans")
     
+    # Settings are read once here rather than per domain in the loop
+    generate_email = not SCANNER_DISABLE_EMAIL_GENERATION
+    flush_size = min(SCAN_INSERT_BATCH_SIZE, SCAN_FLUSH_EVERY)
+    flush_interval = SCAN_FLUSH_INTERVAL
+    total = len(domains)
+    # Per-domain lines are DEBUG; skip building them entirely when not shown
+    verbose = logger.isEnabledFor(logging.DEBUG)
+
     results = []
+    # Results not yet written to Supabase
+    pending = []
     tech_detected_count = 0
     email_generated_count = 0
     error_count = 0
     scan_start_time = time.time()
-    
-    for idx, domain in enumerate(domains, start=1):
-        domain_start_time = time.time()
-        logger.info(f"[{idx}/{len(domains)}] Scanning: {domain}")
-        
-        try:
-            # Run the technology scanner
-            result = scan_technologies(
-                domain,
-                generate_email=not SCANNER_DISABLE_EMAIL_GENERATION,
-            )
+    last_flush_time = time.monotonic()
 
-            # Convert TechScanResult to dict
-            result_dict = result.to_dict()
-            results.append(result_dict)
-            save_scan_result(supabase, result_dict, category)
-            
-            domain_elapsed = time.time() - domain_start_time
-
-            if result.technologies:
-                tech_detected_count += 1
-                tech_count = len(result.technologies)
-                has_email_template = result.generated_email is not None
-                if has_email_template:
-                    email_generated_count += 1
-                top_tech_name = result.top_technology.get("name", "N/A") if result.top_technology else "N/A"
-                logger.info(f"  ✓ {tech_count} technologies detected (top: {top_tech_name}, template: {'Yes' if has_email_template else 'No'}) [{domain_elapsed:.1f}s]")
-                if result.technologies[:5]:
-                    logger.info(f"    Technologies: {', '.join(result.technologies[:5])}")
-            else:
-                if result.error:
-                    logger.info(f"  ✗ Scan error: {result.error} [{domain_elapsed:.1f}s]")
+    uploader = ThreadPoolExecutor(max_workers=SCAN_INSERT_CONCURRENCY)
+    uploads = []
+    try:
+        with ThreadPoolExecutor(max_workers=SCAN_CONCURRENCY) as executor:
+            futures = {executor.submit(_scan_one, domain, generate_email): domain for domain in domains}
+            # Handle scans as they finish so one slow domain doesn't hold up
+            # logging, progress and batch uploads for the rest
+            for idx, future in enumerate(as_completed(futures), start=1):
+                domain = futures[future]
+                result, scan_error, domain_elapsed = future.result()
+                if verbose:
+                    logger.debug(f"[{idx}/{total}] Scanned: {domain}")
+
+                if scan_error is None:
+                    # Convert TechScanResult to dict
+                    result_dict = result.to_dict()
+                    results.append(result_dict)
+                    pending.append(result_dict)
+
+                    if result.technologies:
+                        tech_detected_count += 1
+                        has_email_template = result.generated_email is not None
+                        if has_email_template:
+                            email_generated_count += 1
+                        if verbose:
+                            tech_count = len(result.technologies)
+                            top_tech_name = result.top_technology.get("name", "N/A") if result.top_technology else "N/A"
+                            logger.debug(f"  ✓ {tech_count} technologies detected (top: {top_tech_name}, template: {'Yes' if has_email_template else 'No'}) [{domain_elapsed:.1f}s]")
+                            logger.debug(f"    Technologies: {', '.join(result.technologies[:5])}")
+                    elif verbose:
+                        if result.error:
+                            logger.debug(f"  ✗ Scan error: {result.error} [{domain_elapsed:.1f}s]")
+                        else:
+                            logger.debug(f"  ✗ No technologies detected [{domain_elapsed:.1f}s]")
                 else:
-                    logger.info(f"  ✗ No technologies detected [{domain_elapsed:.1f}s]")
-
+                    error_count += 1
+                    logger.error(f"  ✗ SCAN FAILED for {domain}: {scan_error} [{domain_elapsed:.1f}s]")
+                    err_result = {"domain": domain, "error": str(scan_error), **_SCAN_ERROR_DEFAULTS}
+                    results.append(err_result)
+                    pending.append(err_result)
+
+                # Every completion adds one pending row, so the row count
+                # doubles as the completions since the last flush
+                now = time.monotonic()
+                if len(pending) >= flush_size or now - last_flush_time >= flush_interval:
+                    uploads.append(uploader.submit(save_scan_results, supabase, pending, category))
+                    pending = []
+                    last_flush_time = now
+
+                # Log progress every 10 domains
+                if idx % 10 == 0:
+                    elapsed = time.time() - scan_start_time
+                    rate = idx / elapsed if elapsed > 0 else 0
+                    remaining = total - idx
+                    eta = remaining / rate if rate > 0 else 0
+                    logger.info(f"  >> Progress: {idx}/{total} domains scanned | Rate: {rate:.1f}/s | ETA: {eta:.0f}s")
+    finally:
+        # Flush whatever is buffered, even if the scan loop raised, and wait
+        # for in-flight inserts before reporting. A killed process skips
+        # this; the periodic flushes above bound what it can lose
+        if pending:
+            uploads.append(uploader.submit(save_scan_results, supabase, pending, category))
+        uploader.shutdown(wait=True)
+
+    saved_count = 0
+    for upload in uploads:
+        try:
+            saved_count += upload.result()
         except Exception as e:
-            error_count += 1
-            domain_elapsed = time.time() - domain_start_time
-            logger.error(f"  ✗ SCAN FAILED for {domain}: {e} [{domain_elapsed:.1f}s]")
-            err_result = {
-                "domain": domain,
-                "technologies": [],
-                "scored_technologies": [],
-                "top_technology": None,
-                "emails": [],
-                "error": str(e),
-            }
-            save_scan_result(supabase, err_result, category)
-            results.append(err_result)
-        
-        # Log progress every 10 domains
-        if idx % 10 == 0:
-            elapsed = time.time() - scan_start_time
-            rate = idx / elapsed if elapsed > 0 else 0
-            remaining = len(domains) - idx
-            eta = remaining / rate if rate > 0 else 0
-            logger.info(f"  >> Progress: {idx}/{len(domains)} domains scanned | Rate: {rate:.1f}/s | ETA: {eta:.0f}s")
+            logger.error(f"  ✗ Scan result upload failed: {e}")
 
     total_elapsed = time.time() - scan_start_time
     logger.info("-" * 60)
@@ -667,6 +1103,7 @@ def run_technology_scans(supabase, domains: list[str], category: str) -> list[di
     logger.info(f"  Domains with technologies: {tech_detected_count}")
     logger.info(f"  Email templates prepared: {email_generated_count}")
     logger.info(f"  Scan errors: {error_count}")
+    logger.info(f"  Results saved to {SUPABASE_TABLE}: {saved_count}/{len(results)}")
     logger.info("  NOTE: Email templates are stored in Supabase. Actual sending is done by outreach_worker.py")
     
     return results
@@ -701,8 +1138,7 @@ def main():
         logger.info("STEP: CATEGORY SELECTION")
         logger.info("=" * 60)
         categories = load_categories()
-        category = pick_today_category(categories, supabase)
-        category_idx = categories.index(category) if category in categories else -1
+        category, category_idx = pick_today_category(categories, supabase)
         logger.info(f"Today's category: '{category}' (index {category_idx} of {len(categories)})")
 
         # Scrape Google Places
@@ -714,27 +1150,48 @@ def main():
             record_category_used(supabase, category, domains_found=0, domains_new=0)
             return
 
-        # Deduplicate against Supabase
-        new_domains = filter_new_domains(supabase, domains, category)
+        # Deduplicate against Supabase. New domains and category usage are
+        # recorded on background threads so scanning starts without waiting
+        # for those writes; leaving the block waits for them to finish
+        mark_seen = None
+        with ThreadPoolExecutor(max_workers=2) as background:
+            new_domains, recorded = find_new_domains(supabase, domains, category)
+            if new_domains and not recorded:
+                mark_seen = background.submit(mark_domains_seen, supabase, new_domains, category)
+            background.submit(
+                record_category_used,
+                supabase,
+                category,
+                domains_found=len(domains),
+                domains_new=len(new_domains),
+            )
+            results = run_technology_scans(supabase, new_domains, category) if new_domains else []
+
+        # Domains that aren't recorded as seen would be scanned (and emailed)
+        # again next run, so a failed upsert fails the run
+        if mark_seen is not None:
+            try:
+                mark_seen.result()
+            except Exception as e:
+                raise RuntimeError(
+                    f"Failed to record {len(new_domains)} new domains in {SUPABASE_DOMAIN_TABLE}"
+                ) from e
 
         if not new_domains:
             logger.info("All domains have been previously processed. No new domains to scan.")
             logger.info("Pipeline completed successfully (no work needed)")
-            # Record category usage with domain counts
-            record_category_used(supabase, category, domains_found=len(domains), domains_new=0)
             return
 
-        # Run technology scans
-        results = run_technology_scans(supabase, new_domains, category)
-
-        # Record category usage with domain counts
-        record_category_used(supabase, category, domains_found=len(domains), domains_new=len(new_domains))
-
         # Print summary
         pipeline_elapsed = time.time() - pipeline_start_time
-        tech_count = sum(1 for r in results if r.get("technologies"))
-        email_count = sum(1 for r in results if r.get("generated_email"))
-        error_count = sum(1 for r in results if r.get("error"))
+        tech_count = email_count = error_count = 0
+        for r in results:
+            if r.get("technologies"):
+                tech_count += 1
+            if r.get("generated_email"):
+                email_count += 1
+            if r.get("error"):
+                error_count += 1
 
         logger.info("=" * 60)
         logger.info("PIPELINE RUN COMPLETE")
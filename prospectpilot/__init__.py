@@ -1,61 +1,60 @@
-"""ProspectPilot - Autonomous AI-Powered Outbound Engine for Technical Consultants."""
+"""ProspectPilot - Autonomous AI-Powered Outbound Engine for Technical Consultants.
 
-from .detector import HubSpotDetector, DetectionResult
-from .scanner import scan_domains, scan_domain
-from .email_extractor import (
-    extract_emails_from_html,
-    crawl_for_emails,
-    is_disposable_email,
-    load_disposable_domains,
-)
+Public names are resolved lazily (PEP 562) so that importing a single
+submodule, or running a CLI's ``--help``, doesn't pull in requests,
+BeautifulSoup and the rest of the scanning stack up front.
+"""
 
-# Wappalyzer-style multi-technology detection
-from .tech_detector import TechDetector, TechDetectionResult
-from .tech_scorer import (
-    score_technologies,
-    get_highest_value_tech,
-    ScoredTechnology,
-    TECH_SCORES,
-    RECENT_PROJECTS,
-    TECH_BLACKLIST,
-)
-from .email_generator import (
-    generate_outreach_email,
-    generate_subject_lines,
-    generate_email_body,
-    GeneratedEmail,
-    CONSULTANT_PROFILE,
-    # Company profile (configured via environment variables)
-    COMPANY_PROFILE,
-    # A/B email generation
-    GeneratedEmailAB,
-    TECHNOLOGY_CATEGORIES,
-    generate_email_ab,
-    generate_all_category_emails,
-    generate_outreach_email_ab,
-    generate_version_a_email,
-    generate_version_b_email,
-    generate_subject_lines_ab,
-    # Persona and variant support
-    CLOSESPARK_PROFILE,  # Legacy alias for COMPANY_PROFILE
-    PERSONA_MAP,
-    EMAIL_VARIANTS,
-    SUBJECT_VARIANTS,
-    SUBJECT_VARIANTS_BY_TONE,
-    PersonaEmail,
-    get_persona_for_email,
-    get_variant_for_tech,
-    generate_persona_outreach_email,
-    generate_outreach_email_with_persona,
-    # Variant suppression
-    get_unused_persona_for_domain,
-    select_variant_with_suppression,
-)
-from .tech_scanner import (
-    scan_technologies,
-    scan_technologies_batch,
-    TechScanResult,
-)
+import importlib
+
+# Public name -> submodule that defines it
+_LAZY = {
+    "HubSpotDetector": "detector",
+    "DetectionResult": "detector",
+    "scan_domains": "scanner",
+    "scan_domain": "scanner",
+    "extract_emails_from_html": "email_extractor",
+    "crawl_for_emails": "email_extractor",
+    "is_disposable_email": "email_extractor",
+    "load_disposable_domains": "email_extractor",
+    "TechDetector": "tech_detector",
+    "TechDetectionResult": "tech_detector",
+    "score_technologies": "tech_scorer",
+    "get_highest_value_tech": "tech_scorer",
+    "ScoredTechnology": "tech_scorer",
+    "TECH_SCORES": "tech_scorer",
+    "RECENT_PROJECTS": "tech_scorer",
+    "TECH_BLACKLIST": "tech_scorer",
+    "generate_outreach_email": "email_generator",
+    "generate_subject_lines": "email_generator",
+    "generate_email_body": "email_generator",
+    "GeneratedEmail": "email_generator",
+    "CONSULTANT_PROFILE": "email_generator",
+    "COMPANY_PROFILE": "email_generator",
+    "GeneratedEmailAB": "email_generator",
+    "TECHNOLOGY_CATEGORIES": "email_generator",
+    "generate_email_ab": "email_generator",
+    "generate_all_category_emails": "email_generator",
+    "generate_outreach_email_ab": "email_generator",
+    "generate_version_a_email": "email_generator",
+    "generate_version_b_email": "email_generator",
+    "generate_subject_lines_ab": "email_generator",
+    "CLOSESPARK_PROFILE": "email_generator",
+    "PERSONA_MAP": "email_generator",
+    "EMAIL_VARIANTS": "email_generator",
+    "SUBJECT_VARIANTS": "email_generator",
+    "SUBJECT_VARIANTS_BY_TONE": "email_generator",
+    "PersonaEmail": "email_generator",
+    "get_persona_for_email": "email_generator",
+    "get_variant_for_tech": "email_generator",
+    "generate_persona_outreach_email": "email_generator",
+    "generate_outreach_email_with_persona": "email_generator",
+    "get_unused_persona_for_domain": "email_generator",
+    "select_variant_with_suppression": "email_generator",
+    "scan_technologies": "tech_scanner",
+    "scan_technologies_batch": "tech_scanner",
+    "TechScanResult": "tech_scanner",
+}
 
 __version__ = "1.0.0"
 __all__ = [
@@ -112,3 +111,17 @@ __all__ = [
     "scan_technologies_batch",
     "TechScanResult",
 ]
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -4,9 +4,18 @@
 import argparse
 import json
 import sys
+import time
 from typing import TextIO
 
-from .scanner import scan_domains, scan_domain
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used otherwise
+    orjson = None  # type: ignore
+
+# Minimum seconds between progress line redraws on stderr
+PROGRESS_INTERVAL = 0.1
+
+_last_progress_write = 0.0
 
 
 def parse_domains_file(file_path: str) -> list[str]:
@@ -19,14 +28,13 @@ def parse_domains_file(file_path: str) -> list[str]:
     Returns:
         List of domains
     """
-    domains = []
     with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            # Skip empty lines and comments
-            if line and not line.startswith("#"):
-                domains.append(line)
-    return domains
+        text = f.read()
+    # Skip empty lines and comments
+    return [
+        line for line in map(str.strip, text.splitlines())
+        if line and not line.startswith("#")
+    ]
 
 
 def output_results(
@@ -43,46 +51,95 @@ def output_results(
         pretty: Whether to pretty-print the JSON
     """
     output = output_file or sys.stdout
-    indent = 2 if pretty else None
-    json.dump(results, output, indent=indent)
-    output.write("\n")
+    if orjson is None:
+        indent = 2 if pretty else None
+        json.dump(results, output, indent=indent)
+        output.write("\n")
+        return
+
+    buffer = getattr(output, "buffer", None)
+    if buffer is None:
+        def write(data: bytes) -> None:
+            output.write(data.decode("utf-8"))
+    else:
+        # Write encoded bytes straight to the underlying binary stream
+        output.flush()
+        write = buffer.write
+
+    if not results:
+        write(b"[]\n")
+        return
+
+    # Stream one record at a time so only a single encoded result is held in
+    # memory. Newlines inside JSON strings are escaped, so every raw newline
+    # in a pretty-printed record is layout and can be re-indented one level.
+    option = orjson.OPT_INDENT_2 if pretty else 0
+    separator = b",\n  " if pretty else b","
+    write(b"[\n  " if pretty else b"[")
+    for i, result in enumerate(results):
+        if i:
+            write(separator)
+        data = orjson.dumps(result, option=option)
+        write(data.replace(b"\n", b"\n  ") if pretty else data)
+    write(b"\n]\n" if pretty else b"]\n")
 
 
 def print_progress(current: int, total: int, domain: str) -> None:
-    """Print progress to stderr."""
+    """
+    Print progress to stderr.
+
+    Redraws are throttled to one per PROGRESS_INTERVAL seconds so fast scans
+    don't pay a write and flush per domain; the final update always prints.
+    """
+    global _last_progress_write
+    now = time.monotonic()
+    if current != total and now - _last_progress_write < PROGRESS_INTERVAL:
+        return
+    _last_progress_write = now
     sys.stderr.write(f"\rScanning {current}/{total}: {domain}...")
-    sys.stderr.flush()
     if current == total:
         sys.stderr.write("\n")
+    sys.stderr.flush()
 
 
 def print_summary(results: list[dict]) -> None:
     """Print a summary of scan results to stderr."""
     total = len(results)
-    detected = sum(1 for r in results if r["hubspot_detected"])
-    errors = sum(1 for r in results if r["error"])
-    total_emails = sum(len(r.get("emails", [])) for r in results)
-
-    sys.stderr.write(f"\n{'='*50}\n")
-    sys.stderr.write(f"Scan Summary\n")
-    sys.stderr.write(f"{'='*50}\n")
-    sys.stderr.write(f"Total domains scanned: {total}\n")
-    sys.stderr.write(f"HubSpot detected: {detected}\n")
-    sys.stderr.write(f"Non-generic emails found: {total_emails}\n")
-    sys.stderr.write(f"Errors: {errors}\n")
+    # Gather everything in one pass over the results
+    detected_results = []
+    errors = 0
+    total_emails = 0
+    for r in results:
+        if r["error"]:
+            errors += 1
+        if r["hubspot_detected"]:
+            detected_results.append(r)
+        total_emails += len(r.get("emails", ()))
+    detected = len(detected_results)
+
+    # Collect the report and write it to stderr in one call
+    out = []
+    out.append(f"\n{'='*50}\n")
+    out.append(f"Scan Summary\n")
+    out.append(f"{'='*50}\n")
+    out.append(f"Total domains scanned: {total}\n")
+    out.append(f"HubSpot detected: {detected}\n")
+    out.append(f"Non-generic emails found: {total_emails}\n")
+    out.append(f"Errors: {errors}\n")
 
     if detected > 0:
-        sys.stderr.write(f"\nDomains with HubSpot:\n")
-        for r in results:
-            if r["hubspot_detected"]:
-                portal_info = ""
-                if r["portal_ids"]:
-                    portal_info = f" (Portal IDs: {', '.join(r['portal_ids'])})"
-                sys.stderr.write(
-                    f"  - {r['domain']} (confidence: {r['confidence_score']}%){portal_info}\n"
-                )
-                if r.get("emails"):
-                    sys.stderr.write(f"    Emails: {', '.join(r['emails'])}\n")
+        out.append(f"\nDomains with HubSpot:\n")
+        for r in detected_results:
+            portal_info = ""
+            if r["portal_ids"]:
+                portal_info = f" (Portal IDs: {', '.join(r['portal_ids'])})"
+            out.append(
+                f"  - {r['domain']} (confidence: {r['confidence_score']}%){portal_info}\n"
+            )
+            if r.get("emails"):
+                out.append(f"    Emails: {', '.join(r['emails'])}\n")
+
+    sys.stderr.write("".join(out))
 
 
 def main() -> int:
@@ -210,14 +267,12 @@ Examples:
         sys.stderr.write("\nError: No domains specified\n")
         return 1
 
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_domains = []
+    # Remove duplicates (case-insensitively) while preserving order and the
+    # first spelling seen; the dict doubles as the seen-set and the output
+    unique_domains = {}
     for d in domains:
-        if d.lower() not in seen:
-            seen.add(d.lower())
-            unique_domains.append(d)
-    domains = unique_domains
+        unique_domains.setdefault(d.lower(), d)
+    domains = list(unique_domains.values())
 
     # Set up scanning options
     scan_kwargs = {
@@ -231,7 +286,9 @@ Examples:
     # Progress callback
     progress_callback = None if args.quiet else print_progress
 
-    # Scan domains
+    # Scan domains (imported here so --help/--version skip the HTTP/HTML stack)
+    from .scanner import scan_domains
+
     results = scan_domains(domains, progress_callback=progress_callback, **scan_kwargs)
 
     # Output results
@@ -4,11 +4,19 @@ import json
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Set
 from urllib.parse import urljoin, urlparse
 
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used otherwise
+    orjson = None  # type: ignore
 
 
 logger = logging.getLogger(__name__)
@@ -37,11 +45,13 @@ def load_disposable_domains() -> frozenset:
         return _disposable_domains_cache
     
     try:
-        with open(BLOCKLIST_PATH, "r", encoding="utf-8") as f:
-            domains = json.load(f)
-            _disposable_domains_cache = frozenset(domains)
-            logger.debug(f"Loaded {len(_disposable_domains_cache)} disposable email domains")
-            return _disposable_domains_cache
+        with open(BLOCKLIST_PATH, "rb") as f:
+            raw = f.read()
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        domains = orjson.loads(raw) if orjson else json.loads(raw)
+        _disposable_domains_cache = frozenset(domains)
+        logger.debug(f"Loaded {len(_disposable_domains_cache)} disposable email domains")
+        return _disposable_domains_cache
     except FileNotFoundError:
         logger.warning(f"Disposable email blocklist not found: {BLOCKLIST_PATH}")
         _disposable_domains_cache = frozenset()
@@ -52,6 +62,23 @@ def load_disposable_domains() -> frozenset:
         return _disposable_domains_cache
 
 
+def _split_email(email: str) -> tuple[str, str]:
+    """
+    Split a (lowercased) email into local part and domain in one pass.
+
+    Args:
+        email: Lowercased email address to split
+
+    Returns:
+        Tuple of (local_part, domain); domain is empty unless the address
+        contains exactly one "@"
+    """
+    local_part, _, email_domain = email.partition("@")
+    if "@" in email_domain:
+        return local_part, ""
+    return local_part, email_domain
+
+
 def is_disposable_email(email: str) -> bool:
     """
     Check if an email is from a disposable/honeypot domain.
@@ -62,14 +89,10 @@ def is_disposable_email(email: str) -> bool:
     Returns:
         True if the email is from a disposable domain, False otherwise
     """
-    if "@" not in email:
+    _, email_domain = _split_email(email.lower())
+    if not email_domain:
         return False
-    parts = email.lower().split("@")
-    if len(parts) != 2 or not parts[1]:
-        return False
-    email_domain = parts[1]
-    disposable_domains = load_disposable_domains()
-    return email_domain in disposable_domains
+    return email_domain in load_disposable_domains()
 
 
 # Generic email prefixes to exclude
@@ -102,10 +125,22 @@ INVALID_DOMAINS = frozenset([
     "domain.com",
 ])
 
+# Asset file extensions the email pattern picks up from names like logo@2x.png
+INVALID_EXTENSIONS = (".png", ".jpg", ".gif", ".svg", ".css", ".js")
+
 # Email regex pattern
 EMAIL_PATTERN = re.compile(
     r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'
 )
+# Same pattern for raw response bodies; it is pure ASCII, so matches can be
+# found without decoding the page first
+EMAIL_PATTERN_BYTES = re.compile(EMAIL_PATTERN.pattern.encode("ascii"))
+
+# Compiled once; returns every <a href> value as a string
+_HREF_XPATH = etree.XPath("//a/@href")
+
+# Maximum number of pages fetched concurrently per crawled site
+CRAWL_CONCURRENCY = 8
 
 # Common pages that might contain contact information
 CONTACT_PATHS = [
@@ -121,6 +156,31 @@ CONTACT_PATHS = [
 ]
 
 
+def _extract_hrefs(html_content: str | bytes) -> list[str]:
+    """
+    Return the href of every link in an HTML document.
+
+    Uses lxml directly rather than BeautifulSoup so the hrefs come straight
+    out of libxml2 without building a Python object per tag.
+
+    Args:
+        html_content: The HTML content to parse, as text or raw bytes
+
+    Returns:
+        List of href values, in document order
+    """
+    try:
+        try:
+            tree = lxml.html.fromstring(html_content)
+        except ValueError:
+            # lxml rejects str input that carries an XML encoding declaration
+            tree = lxml.html.fromstring(html_content.encode("utf-8"))
+    except etree.ParserError:
+        # Empty or whitespace-only document (possibly after the declaration)
+        return []
+    return _HREF_XPATH(tree)
+
+
 def is_generic_email(email: str) -> bool:
     """
     Check if an email is generic (should be excluded).
@@ -131,7 +191,7 @@ def is_generic_email(email: str) -> bool:
     Returns:
         True if the email is generic, False otherwise
     """
-    local_part = email.split("@")[0].lower()
+    local_part, _ = _split_email(email.lower())
     return local_part in GENERIC_EMAIL_PREFIXES
 
 
@@ -147,36 +207,41 @@ def is_valid_email(email: str, domain: str) -> bool:
         True if the email is valid and relevant
     """
     email_lower = email.lower()
+    local_part, email_domain = _split_email(email_lower)
 
     # Skip generic emails
-    if is_generic_email(email_lower):
+    if local_part in GENERIC_EMAIL_PREFIXES:
         return False
 
     # Skip disposable/honeypot email domains
-    if is_disposable_email(email_lower):
+    if email_domain and email_domain in load_disposable_domains():
         logger.debug(f"Skipping disposable email: {email_lower}")
         return False
 
     # Skip obviously fake or example emails
-    email_parts = email_lower.split("@")
-    email_domain = email_parts[1] if len(email_parts) == 2 else ""
     if email_domain in INVALID_DOMAINS:
         return False
 
     # Skip image and file extensions mistakenly captured
-    if email_domain.endswith((".png", ".jpg", ".gif", ".svg", ".css", ".js")):
+    if email_domain.endswith(INVALID_EXTENSIONS):
         return False
 
     return True
 
 
-def extract_emails_from_html(html_content: str, domain: str) -> Set[str]:
+def extract_emails_from_html(
+    html_content: str | bytes,
+    domain: str,
+    hrefs: list[str] | None = None,
+) -> Set[str]:
     """
     Extract non-generic emails from HTML content.
 
     Args:
-        html_content: The HTML content to parse
+        html_content: The HTML content to parse, as text or the raw response
+            body (which is searched without being decoded)
         domain: The domain being scanned
+        hrefs: Link hrefs already extracted from html_content, to skip re-parsing
 
     Returns:
         Set of non-generic email addresses
@@ -184,51 +249,64 @@ def extract_emails_from_html(html_content: str, domain: str) -> Set[str]:
     emails = set()
 
     # Find all email patterns
-    found_emails = EMAIL_PATTERN.findall(html_content)
+    if isinstance(html_content, bytes):
+        found_emails = [m.decode("ascii") for m in EMAIL_PATTERN_BYTES.findall(html_content)]
+    else:
+        found_emails = EMAIL_PATTERN.findall(html_content)
 
     # Also look for mailto: links
-    soup = BeautifulSoup(html_content, "lxml")
-    for link in soup.find_all("a", href=True):
-        href = link.get("href", "")
+    if hrefs is None:
+        hrefs = _extract_hrefs(html_content)
+    for href in hrefs:
         if href.startswith("mailto:"):
             email = href.replace("mailto:", "").split("?")[0].strip()
             if email:
                 found_emails.append(email)
 
-    # Process all found emails with detailed logging
+    # Process all found emails with detailed logging. Pages often repeat the
+    # same address many times, so each distinct address is filtered only once.
+    checked = set()
+    disposable_domains = load_disposable_domains()
     for email in found_emails:
         email_lower = email.lower()
+        if email_lower in checked:
+            continue
+        checked.add(email_lower)
+        # Lowercase and split once, then run every filter on the parts
+        local_part, email_domain = _split_email(email_lower)
 
         # Check for generic email
-        if is_generic_email(email_lower):
+        if local_part in GENERIC_EMAIL_PREFIXES:
             logger.debug(f"Email extractor: filtered generic email: {email_lower}")
             continue
 
         # Check for disposable/honeypot email
-        if is_disposable_email(email_lower):
+        if email_domain and email_domain in disposable_domains:
             logger.debug(f"Email extractor: filtered disposable/honeypot: {email_lower}")
             continue
 
         # Check for invalid domains
-        email_parts = email_lower.split("@")
-        if len(email_parts) == 2:
-            email_domain = email_parts[1]
+        if email_domain:
             if email_domain in INVALID_DOMAINS:
                 logger.debug(f"Email extractor: filtered invalid domain: {email_lower}")
                 continue
-            if email_domain.endswith((".png", ".jpg", ".gif", ".svg", ".css", ".js")):
+            if email_domain.endswith(INVALID_EXTENSIONS):
                 logger.debug(f"Email extractor: filtered file extension: {email_lower}")
                 continue
 
         # Email passed all filters
-        if email_lower not in emails:
-            logger.info(f"Email extractor: accepted email: {email_lower}")
-            emails.add(email_lower)
+        logger.info(f"Email extractor: accepted email: {email_lower}")
+        emails.add(email_lower)
 
     return emails
 
 
-def get_internal_links(html_content: str, base_url: str, domain: str) -> Set[str]:
+def get_internal_links(
+    html_content: str,
+    base_url: str,
+    domain: str,
+    hrefs: list[str] | None = None,
+) -> Set[str]:
     """
     Extract internal links from HTML content.
 
@@ -236,16 +314,18 @@ def get_internal_links(html_content: str, base_url: str, domain: str) -> Set[str
         html_content: The HTML content to parse
         base_url: The base URL for resolving relative links
         domain: The domain being scanned
+        hrefs: Link hrefs already extracted from html_content, to skip re-parsing
 
     Returns:
         Set of internal URLs
     """
-    soup = BeautifulSoup(html_content, "lxml")
     links = set()
     parsed_base = urlparse(base_url)
 
-    for link in soup.find_all("a", href=True):
-        href = link.get("href", "").strip()
+    if hrefs is None:
+        hrefs = _extract_hrefs(html_content)
+    for href in hrefs:
+        href = href.strip()
 
         # Skip empty, javascript, and anchor links
         if not href or href.startswith(("#", "javascript:", "mailto:", "tel:")):
@@ -264,6 +344,44 @@ def get_internal_links(html_content: str, base_url: str, domain: str) -> Set[str
     return links
 
 
+def _fetch_html(
+    session: requests.Session,
+    url: str,
+    headers: dict,
+    timeout: int,
+) -> bytes | None:
+    """
+    Fetch a page and return its raw HTML body.
+
+    Args:
+        session: Shared session to send the request on
+        url: URL to fetch
+        headers: Request headers
+        timeout: Request timeout in seconds
+
+    Returns:
+        The undecoded response body, or None if the request failed or
+        wasn't an HTML 200
+    """
+    try:
+        response = session.get(
+            url,
+            headers=headers,
+            timeout=timeout,
+            allow_redirects=True,
+        )
+    except requests.RequestException:
+        # Skip pages that fail to load
+        return None
+
+    if response.status_code != 200:
+        return None
+    if "text/html" not in response.headers.get("content-type", ""):
+        return None
+    # Left undecoded: the email regex runs on bytes and lxml decodes itself
+    return response.content
+
+
 def crawl_for_emails(
     base_url: str,
     domain: str,
@@ -296,12 +414,13 @@ def crawl_for_emails(
     visited_urls = set()
     urls_to_visit = set()
 
-    # Start with emails from the homepage
-    all_emails.update(extract_emails_from_html(initial_html, domain))
+    # Start with emails and links from the homepage, parsing it only once
+    initial_hrefs = _extract_hrefs(initial_html)
+    all_emails.update(extract_emails_from_html(initial_html, domain, initial_hrefs))
     visited_urls.add(base_url)
 
     # Get initial links
-    internal_links = get_internal_links(initial_html, base_url, domain)
+    internal_links = get_internal_links(initial_html, base_url, domain, initial_hrefs)
 
     # Prioritize contact-related pages
     parsed_base = urlparse(base_url)
@@ -312,33 +431,36 @@ def crawl_for_emails(
     # Add other internal links
     urls_to_visit.update(internal_links)
 
-    # Crawl additional pages
+    # Crawl additional pages in parallel batches over one pooled session,
+    # so connections (and TLS handshakes) are shared across the site's pages
     pages_crawled = 1
-    while urls_to_visit and pages_crawled < max_pages:
-        url = urls_to_visit.pop()
-
-        if url in visited_urls:
-            continue
-
-        visited_urls.add(url)
-
-        try:
-            response = requests.get(
-                url,
-                headers=headers,
-                timeout=timeout,
-                allow_redirects=True,
-            )
-
-            if response.status_code == 200:
-                content_type = response.headers.get("content-type", "")
-                if "text/html" in content_type:
-                    all_emails.update(extract_emails_from_html(response.text, domain))
-                    pages_crawled += 1
-
-        except requests.RequestException:
-            # Skip pages that fail to load
-            continue
+    workers = max(1, min(CRAWL_CONCURRENCY, max_pages))
+    adapter = HTTPAdapter(pool_maxsize=workers)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while urls_to_visit and pages_crawled < max_pages:
+                # Never fetch more pages than are left in the budget
+                batch = []
+                while urls_to_visit and len(batch) < max_pages - pages_crawled:
+                    url = urls_to_visit.pop()
+                    if url not in visited_urls:
+                        visited_urls.add(url)
+                        batch.append(url)
+
+                futures = [
+                    executor.submit(_fetch_html, session, url, headers, timeout)
+                    for url in batch
+                ]
+                for future in as_completed(futures):
+                    html = future.result()
+                    if html is not None:
+                        all_emails.update(extract_emails_from_html(html, domain))
+                        pages_crawled += 1
+    finally:
+        session.close()
 
     logger.info(f"Email extractor: FINAL accepted emails for {domain}: {sorted(all_emails)}")
     return all_emails
@@ -4,9 +4,18 @@
 import argparse
 import json
 import sys
+import time
 from typing import TextIO
 
-from .tech_scanner import scan_technologies, scan_technologies_batch
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used otherwise
+    orjson = None  # type: ignore
+
+# Minimum seconds between progress line redraws on stderr
+PROGRESS_INTERVAL = 0.1
+
+_last_progress_write = 0.0
 
 
 def parse_domains_file(file_path: str) -> list[str]:
@@ -19,14 +28,13 @@ def parse_domains_file(file_path: str) -> list[str]:
     Returns:
         List of domains
     """
-    domains = []
     with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            # Skip empty lines and comments
-            if line and not line.startswith("#"):
-                domains.append(line)
-    return domains
+        text = f.read()
+    # Skip empty lines and comments
+    return [
+        line for line in map(str.strip, text.splitlines())
+        if line and not line.startswith("#")
+    ]
 
 
 def output_results(
@@ -43,54 +51,100 @@ def output_results(
         pretty: Whether to pretty-print the JSON
     """
     output = output_file or sys.stdout
-    indent = 2 if pretty else None
-    json.dump(results, output, indent=indent)
-    output.write("\n")
+    if orjson is None:
+        indent = 2 if pretty else None
+        json.dump(results, output, indent=indent)
+        output.write("\n")
+        return
+
+    buffer = getattr(output, "buffer", None)
+    if buffer is None:
+        def write(data: bytes) -> None:
+            output.write(data.decode("utf-8"))
+    else:
+        # Write encoded bytes straight to the underlying binary stream
+        output.flush()
+        write = buffer.write
+
+    if not results:
+        write(b"[]\n")
+        return
+
+    # Stream one record at a time so only a single encoded result is held in
+    # memory. Newlines inside JSON strings are escaped, so every raw newline
+    # in a pretty-printed record is layout and can be re-indented one level.
+    option = orjson.OPT_INDENT_2 if pretty else 0
+    separator = b",\n  " if pretty else b","
+    write(b"[\n  " if pretty else b"[")
+    for i, result in enumerate(results):
+        if i:
+            write(separator)
+        data = orjson.dumps(result, option=option)
+        write(data.replace(b"\n", b"\n  ") if pretty else data)
+    write(b"\n]\n" if pretty else b"]\n")
 
 
 def print_progress(current: int, total: int, domain: str) -> None:
-    """Print progress to stderr."""
+    """
+    Print progress to stderr.
+
+    Redraws are throttled to one per PROGRESS_INTERVAL seconds so fast scans
+    don't pay a write and flush per domain; the final update always prints.
+    """
+    global _last_progress_write
+    now = time.monotonic()
+    if current != total and now - _last_progress_write < PROGRESS_INTERVAL:
+        return
+    _last_progress_write = now
     sys.stderr.write(f"\rScanning {current}/{total}: {domain}...")
-    sys.stderr.flush()
     if current == total:
         sys.stderr.write("\n")
+    sys.stderr.flush()
 
 
 def print_summary(results: list[dict]) -> None:
     """Print a summary of scan results to stderr."""
     total = len(results)
-    with_techs = sum(1 for r in results if r.get("technologies"))
-    errors = sum(1 for r in results if r.get("error"))
-    all_techs = set()
+    # Gather everything in one pass over the results
+    with_techs = 0
+    errors = 0
+    tech_counts = {}
+    generated = []
     for r in results:
-        all_techs.update(r.get("technologies", []))
-
-    sys.stderr.write(f"\n{'='*60}\n")
-    sys.stderr.write(f"Technology Scan Summary\n")
-    sys.stderr.write(f"{'='*60}\n")
-    sys.stderr.write(f"Total domains scanned: {total}\n")
-    sys.stderr.write(f"Domains with technologies: {with_techs}\n")
-    sys.stderr.write(f"Unique technologies found: {len(all_techs)}\n")
-    sys.stderr.write(f"Errors: {errors}\n")
-
-    if with_techs > 0:
-        sys.stderr.write(f"\nTop Technologies Detected:\n")
-        tech_counts = {}
-        for r in results:
-            for tech in r.get("technologies", []):
+        technologies = r.get("technologies")
+        if technologies:
+            with_techs += 1
+            for tech in technologies:
                 tech_counts[tech] = tech_counts.get(tech, 0) + 1
+        if r.get("error"):
+            errors += 1
+        if r.get("generated_email"):
+            generated.append(r)
+
+    # Collect the report and write it to stderr in one call
+    out = []
+    out.append(f"\n{'='*60}\n")
+    out.append(f"Technology Scan Summary\n")
+    out.append(f"{'='*60}\n")
+    out.append(f"Total domains scanned: {total}\n")
+    out.append(f"Domains with technologies: {with_techs}\n")
+    out.append(f"Unique technologies found: {len(tech_counts)}\n")
+    out.append(f"Errors: {errors}\n")
 
+    if with_techs > 0:
+        out.append(f"\nTop Technologies Detected:\n")
         # Sort by count
         sorted_techs = sorted(tech_counts.items(), key=lambda x: x[1], reverse=True)
         for tech, count in sorted_techs[:10]:
-            sys.stderr.write(f"  - {tech}: {count} domains\n")
+            out.append(f"  - {tech}: {count} domains\n")
+
+        out.append(f"\nEmails Generated:\n")
+        for r in generated:
+            email_data = r["generated_email"]
+            out.append(f"  - {r['domain']}: {email_data.get('selected_technology')}\n")
+            out.append(f"    Subject: {email_data.get('subject_lines', [''])[0]}\n")
 
-        sys.stderr.write(f"\nEmails Generated:\n")
-        for r in results:
-            if r.get("generated_email"):
-                email_data = r["generated_email"]
-                sys.stderr.write(f"  - {r['domain']}: {email_data.get('selected_technology')}\n")
-                sys.stderr.write(f"    Subject: {email_data.get('subject_lines', [''])[0]}\n")
+    sys.stderr.write("".join(out))
 
 
 def main() -> int:
@@ -251,14 +305,12 @@ Output Format:
         sys.stderr.write("\nError: No domains specified\n")
         return 1
 
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_domains = []
+    # Remove duplicates (case-insensitively) while preserving order and the
+    # first spelling seen; the dict doubles as the seen-set and the output
+    unique_domains = {}
     for d in domains:
-        if d.lower() not in seen:
-            seen.add(d.lower())
-            unique_domains.append(d)
-    domains = unique_domains
+        unique_domains.setdefault(d.lower(), d)
+    domains = list(unique_domains.values())
 
     # Build consultant profile if any custom values provided
     consultant_profile = None
@@ -288,7 +340,9 @@ Output Format:
     # Progress callback
     progress_callback = None if args.quiet else print_progress
 
-    # Scan domains
+    # Scan domains (imported here so --help/--version skip the HTTP/HTML stack)
+    from .tech_scanner import scan_technologies_batch
+
     results = scan_technologies_batch(
         domains,
         progress_callback=progress_callback,
@@ -390,12 +390,44 @@ TECHNOLOGY_PATTERNS = {
 }
 
 
+def _compile_patterns(patterns: dict[str, dict[str, Any]]) -> list[tuple]:
+    """
+    Precompile a technology pattern table for matching.
+
+    Returns a list of (tech_name, tech_info, body_patterns, header_patterns)
+    where body_patterns is [(label, regex)] searched against the HTML and
+    header_patterns is [(header_name, header_name_lower, regex)].
+    """
+    compiled = []
+    for tech_name, tech_info in patterns.items():
+        tech_patterns = tech_info.get("patterns", {})
+        body_patterns = [
+            (f"{label}: {pattern}", re.compile(pattern, re.IGNORECASE))
+            for key, label in (("scripts", "script"), ("html", "html"), ("js_vars", "js"))
+            for pattern in tech_patterns.get(key, [])
+        ]
+        header_patterns = [
+            (header_name, header_name.lower(), re.compile(header_pattern, re.IGNORECASE))
+            for header_name, header_pattern in tech_patterns.get("headers", {}).items()
+        ]
+        compiled.append((tech_name, tech_info, body_patterns, header_patterns))
+    return compiled
+
+
+# Compiled once at import so every scan reuses the same regex objects
+_COMPILED_PATTERNS = _compile_patterns(TECHNOLOGY_PATTERNS)
+
+
 class TechDetector:
     """Detector for various technologies on websites."""
 
     def __init__(self):
         """Initialize the technology detector."""
         self.patterns = TECHNOLOGY_PATTERNS
+        # Compiled form of self.patterns and the table it was built from; the
+        # shared module-level compile is reused unless patterns is replaced
+        self._compiled = _COMPILED_PATTERNS
+        self._compiled_from = TECHNOLOGY_PATTERNS
 
     def detect(
         self,
@@ -406,6 +438,10 @@ class TechDetector:
         """
         Detect technologies in HTML content and headers.
 
+        Patterns are recompiled only when ``self.patterns`` is reassigned to
+        a different table (an identity check); editing the current table in
+        place is not picked up.
+
         Args:
             domain: The domain being scanned
             html_content: The HTML content of the page
@@ -421,38 +457,26 @@ class TechDetector:
         # Pre-process headers to lowercase keys for efficient matching
         headers_lower = {k.lower(): v for k, v in headers.items()}
 
-        for tech_name, tech_info in self.patterns.items():
+        if self.patterns is not self._compiled_from:
+            self._compiled = _compile_patterns(self.patterns)
+            self._compiled_from = self.patterns
+
+        for tech_name, tech_info, body_patterns, header_patterns in self._compiled:
             matched = False
             matched_patterns = []
 
-            patterns = tech_info.get("patterns", {})
-
-            # Check script patterns
-            for pattern in patterns.get("scripts", []):
-                if re.search(pattern, html_content, re.IGNORECASE):
-                    matched = True
-                    matched_patterns.append(f"script: {pattern}")
-
-            # Check HTML patterns
-            for pattern in patterns.get("html", []):
-                if re.search(pattern, html_content, re.IGNORECASE):
-                    matched = True
-                    matched_patterns.append(f"html: {pattern}")
-
-            # Check JS variable patterns
-            for pattern in patterns.get("js_vars", []):
-                if re.search(pattern, html_content, re.IGNORECASE):
+            # Check script, HTML and JS variable patterns
+            for label, regex in body_patterns:
+                if regex.search(html_content):
                     matched = True
-                    matched_patterns.append(f"js: {pattern}")
+                    matched_patterns.append(label)
 
             # Check header patterns (using pre-processed lowercase headers)
-            header_patterns = patterns.get("headers", {})
-            for header_name, header_pattern in header_patterns.items():
-                header_name_lower = header_name.lower()
+            for header_name, header_name_lower, regex in header_patterns:
                 # Check for exact match or prefix match
                 for h_name, h_value in headers_lower.items():
                     if h_name.startswith(header_name_lower):
-                        if re.search(header_pattern, h_value, re.IGNORECASE):
+                        if regex.search(h_value):
                             matched = True
                             matched_patterns.append(f"header: {header_name}")
                             break
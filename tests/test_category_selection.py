@@ -8,7 +8,7 @@ These tests verify that:
 """
 
 import os
-from datetime import date
+from datetime import date, timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -46,9 +46,21 @@ class TestCategorySelection:
             importlib.reload(pipeline_worker)
             
             categories = ["cat1", "cat2", "cat3"]
-            result = pipeline_worker.pick_today_category(categories, None)
+            result, idx = pipeline_worker.pick_today_category(categories, None)
             
             assert result == "test_category"
+            assert idx == -1
+
+    def test_pick_today_category_override_in_list_returns_index(self, pipeline_worker):
+        """Test that an override naming a known category reports its index."""
+        with patch.dict(os.environ, {"CATEGORY_OVERRIDE": "cat2"}):
+            import importlib
+            importlib.reload(pipeline_worker)
+
+            categories = ["cat1", "cat2", "cat3"]
+            result = pipeline_worker.pick_today_category(categories, None)
+
+            assert result == ("cat2", 1)
 
     def test_pick_today_category_deterministic_without_supabase(self, pipeline_worker):
         """Test deterministic category selection when no Supabase client."""
@@ -59,15 +71,28 @@ class TestCategorySelection:
             categories = ["cat1", "cat2", "cat3", "cat4", "cat5"]
             
             # Without supabase, should use deterministic selection
-            result = pipeline_worker.pick_today_category(categories, None)
+            result, idx = pipeline_worker.pick_today_category(categories, None)
             
-            # Should be one of the categories
+            # Should be one of the categories, with a matching index
             assert result in categories
+            assert categories[idx] == result
             
             # Should be deterministic (same result on same day)
-            result2 = pipeline_worker.pick_today_category(categories, None)
+            result2, _ = pipeline_worker.pick_today_category(categories, None)
             assert result == result2
 
+    def test_pick_category_for_date(self, pipeline_worker):
+        """Test that rotation is a pure function of the date."""
+        categories = ["cat1", "cat2", "cat3"]
+        day = date(2024, 1, 1)
+
+        result, idx = pipeline_worker.pick_category_for_date(day, categories)
+
+        assert idx == day.toordinal() % 3
+        assert result == categories[idx]
+        next_result, _ = pipeline_worker.pick_category_for_date(day + timedelta(days=1), categories)
+        assert next_result == categories[(idx + 1) % 3]
+
     def test_pick_today_category_skips_recently_used(self, pipeline_worker):
         """Test that recently used categories are skipped."""
         with patch.dict(os.environ, {
@@ -91,10 +116,11 @@ class TestCategorySelection:
                 {"category": deterministic_cat}
             ]
             
-            result = pipeline_worker.pick_today_category(categories, mock_supabase)
+            result, idx = pipeline_worker.pick_today_category(categories, mock_supabase)
             
             # Should not select the recently used category
             assert result != deterministic_cat or len(categories) == 1
+            assert categories[idx] == result
 
     def test_pick_today_category_fallback_when_all_used(self, pipeline_worker):
         """Test fallback to deterministic when all categories are in cooldown."""
@@ -113,12 +139,13 @@ class TestCategorySelection:
                 {"category": cat} for cat in categories
             ]
             
-            result = pipeline_worker.pick_today_category(categories, mock_supabase)
+            result, idx = pipeline_worker.pick_today_category(categories, mock_supabase)
             
             # Should fall back to deterministic selection
             deterministic_idx = date.today().toordinal() % len(categories)
             deterministic_cat = categories[deterministic_idx]
             assert result == deterministic_cat
+            assert idx == deterministic_idx
 
     def test_cooldown_disabled_when_zero(self, pipeline_worker):
         """Test that cooldown is disabled when CATEGORY_COOLDOWN_DAYS=0."""
@@ -134,7 +161,7 @@ class TestCategorySelection:
             # Mock supabase - but it should not be called
             mock_supabase = MagicMock()
             
-            result = pipeline_worker.pick_today_category(categories, mock_supabase)
+            result, _ = pipeline_worker.pick_today_category(categories, mock_supabase)
             
             # Should use deterministic selection
             assert result in categories
@@ -243,6 +270,42 @@ class TestLoadCategories:
         assert len(categories) > 0
         assert all(isinstance(c, str) for c in categories)
 
+    def test_load_categories_cached(self, pipeline_worker, tmp_path):
+        """Test that the file is parsed once and callers get independent lists."""
+        categories_file = tmp_path / "categories.json"
+        categories_file.write_text('["cat1", "cat2"]', encoding="utf-8")
+        with patch.dict(os.environ, {"CATEGORIES_FILE": str(categories_file)}, clear=False):
+            import importlib
+            importlib.reload(pipeline_worker)
+
+            first = pipeline_worker.load_categories()
+            first.append("mutated")
+            categories_file.write_text('["other"]', encoding="utf-8")
+
+            assert pipeline_worker.load_categories() == ["cat1", "cat2"]
+
+    def test_load_categories_without_orjson(self, pipeline_worker, tmp_path):
+        """Test that the stdlib json fallback parses the file the same way."""
+        categories_file = tmp_path / "categories.json"
+        categories_file.write_text('["cat1", "cat2"]', encoding="utf-8")
+        with patch.dict(os.environ, {"CATEGORIES_FILE": str(categories_file)}, clear=False):
+            import importlib
+            importlib.reload(pipeline_worker)
+
+            with patch.object(pipeline_worker, "orjson", None):
+                assert pipeline_worker.load_categories() == ["cat1", "cat2"]
+
+    def test_load_categories_invalid_json(self, pipeline_worker, tmp_path):
+        """Test that malformed JSON surfaces as ValueError."""
+        categories_file = tmp_path / "categories.json"
+        categories_file.write_text('["cat1",', encoding="utf-8")
+        with patch.dict(os.environ, {"CATEGORIES_FILE": str(categories_file)}, clear=False):
+            import importlib
+            importlib.reload(pipeline_worker)
+
+            with pytest.raises(ValueError):
+                pipeline_worker.load_categories()
+
     def test_load_categories_file_not_found(self, pipeline_worker):
         """Test error handling when file doesn't exist."""
         with patch.dict(os.environ, {"CATEGORIES_FILE": "/nonexistent/file.json"}, clear=False):
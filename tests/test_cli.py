@@ -0,0 +1,185 @@
+"""
+Tests for the command-line helpers.
+
+These tests verify that:
+1. Results are streamed as JSON with and without orjson installed
+2. Duplicate domains are dropped case-insensitively, keeping the first spelling
+3. Domain files are parsed skipping blanks and comments
+4. Progress redraws are throttled but the final update always prints
+5. Summaries report counts gathered in a single pass
+"""
+
+import importlib
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture(params=["prospectpilot.cli", "prospectpilot.tech_cli"])
+def cli(request):
+    """Import and return a fresh copy of each CLI module."""
+    module = importlib.import_module(request.param)
+    importlib.reload(module)
+    return module
+
+
+RESULTS = [{"domain": "example.com", "technologies": ["Shopify"], "error": None}]
+
+
+class TestParseDomainsFile:
+    """Test reading domains from a file."""
+
+    def test_skips_blank_and_comment_lines(self, cli, tmp_path):
+        """Test that whitespace is stripped and comments/blank lines dropped."""
+        path = tmp_path / "domains.txt"
+        path.write_text("# header\nexample.com\n\n  b.io  \r\n   # indented comment\nc.io", encoding="utf-8")
+
+        assert cli.parse_domains_file(str(path)) == ["example.com", "b.io", "c.io"]
+
+
+class TestOutputResults:
+    """Test JSON output of scan results."""
+
+    def test_writes_to_binary_buffer(self, cli):
+        """Test that a text stream backed by a buffer receives the JSON bytes."""
+        raw = io.BytesIO()
+        output = io.TextIOWrapper(raw, encoding="utf-8")
+
+        cli.output_results(RESULTS, output, pretty=True)
+        output.flush()
+
+        text = raw.getvalue().decode("utf-8")
+        assert text.endswith("\n")
+        assert json.loads(text) == RESULTS
+
+    def test_compact_to_plain_text_stream(self, cli):
+        """Test that streams without a buffer get decoded text on one line."""
+        output = io.StringIO()
+
+        cli.output_results(RESULTS, output, pretty=False)
+
+        assert output.getvalue().count("\n") == 1
+        assert json.loads(output.getvalue()) == RESULTS
+
+    def test_streamed_layout_matches_stdlib(self, cli):
+        """Test that per-record streaming reproduces the indent=2 document."""
+        results = RESULTS + [{"domain": "b.io", "notes": "multi\nline", "technologies": []}]
+        output = io.StringIO()
+
+        cli.output_results(results, output, pretty=True)
+
+        assert output.getvalue() == json.dumps(results, indent=2) + "\n"
+
+    def test_empty_results(self, cli):
+        """Test that an empty result list is written as an empty array."""
+        for pretty in (True, False):
+            output = io.StringIO()
+            cli.output_results([], output, pretty=pretty)
+            assert output.getvalue() == "[]\n"
+
+    def test_stdlib_fallback(self, cli):
+        """Test output without orjson installed."""
+        output = io.StringIO()
+
+        with patch.object(cli, "orjson", None):
+            cli.output_results(RESULTS, output, pretty=True)
+
+        assert output.getvalue().endswith("\n")
+        assert json.loads(output.getvalue()) == RESULTS
+
+
+class TestPrintProgress:
+    """Test throttled progress output."""
+
+    def test_updates_throttled_final_always_written(self, cli):
+        """Test that rapid updates collapse to the first and the last."""
+        stderr = io.StringIO()
+
+        with patch("sys.stderr", stderr), patch.object(cli.time, "monotonic", return_value=1000.0):
+            for i in range(1, 101):
+                cli.print_progress(i, 100, f"d{i}.com")
+
+        assert stderr.getvalue() == "\rScanning 1/100: d1.com...\rScanning 100/100: d100.com...\n"
+
+    def test_writes_again_after_interval(self, cli):
+        """Test that an update is written once the interval has passed."""
+        stderr = io.StringIO()
+        clock = iter([1000.0, 1000.05, 1000.2])
+
+        with patch("sys.stderr", stderr), patch.object(cli.time, "monotonic", side_effect=lambda: next(clock)):
+            for i in range(1, 4):
+                cli.print_progress(i, 10, f"d{i}.com")
+
+        assert "d1.com" in stderr.getvalue()
+        assert "d2.com" not in stderr.getvalue()
+        assert "d3.com" in stderr.getvalue()
+
+
+class TestPrintSummary:
+    """Test the stderr scan summaries."""
+
+    def test_hubspot_summary(self):
+        """Test counts and the detected-domain listing."""
+        from prospectpilot import cli
+
+        results = [
+            {"domain": "a.com", "hubspot_detected": True, "error": None, "portal_ids": ["123"],
+             "confidence_score": 90, "emails": ["x@a.com"]},
+            {"domain": "b.com", "hubspot_detected": False, "error": "timeout", "portal_ids": [],
+             "confidence_score": 0},
+        ]
+        stderr = io.StringIO()
+
+        with patch("sys.stderr", stderr):
+            cli.print_summary(results)
+
+        text = stderr.getvalue()
+        assert "HubSpot detected: 1\n" in text
+        assert "Non-generic emails found: 1\n" in text
+        assert "Errors: 1\n" in text
+        assert "  - a.com (confidence: 90%) (Portal IDs: 123)\n    Emails: x@a.com\n" in text
+        assert "b.com" not in text
+
+    def test_tech_summary(self):
+        """Test technology counts and generated-email listing."""
+        from prospectpilot import tech_cli
+
+        results = [
+            {"domain": "a.com", "technologies": ["Shopify", "Stripe"], "error": None,
+             "generated_email": {"selected_technology": "Shopify", "subject_lines": ["Hi"]}},
+            {"domain": "b.com", "technologies": ["Stripe"], "error": None},
+            {"domain": "c.com", "technologies": [], "error": "dns"},
+        ]
+        stderr = io.StringIO()
+
+        with patch("sys.stderr", stderr):
+            tech_cli.print_summary(results)
+
+        text = stderr.getvalue()
+        assert "Domains with technologies: 2\n" in text
+        assert "Unique technologies found: 2\n" in text
+        assert "Errors: 1\n" in text
+        assert "  - Stripe: 2 domains\n  - Shopify: 1 domains\n" in text
+        assert "  - a.com: Shopify\n    Subject: Hi\n" in text
+
+
+class TestMainDedup:
+    """Test domain de-duplication in main()."""
+
+    def test_duplicates_removed_case_insensitively(self):
+        """Test that the first spelling of each domain is scanned once, in order."""
+        from prospectpilot import cli
+
+        argv = ["hubspot-scanner", "-q", "--no-summary", "Example.com", "b.io", "example.COM", "B.io", "c.io"]
+        with patch("sys.argv", argv), \
+                patch("prospectpilot.scanner.scan_domains", return_value=[]) as scan, \
+                patch.object(cli, "output_results"):
+            assert cli.main() == 0
+
+        assert scan.call_args.args[0] == ["Example.com", "b.io", "c.io"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,236 @@
+"""
+Tests for email extraction and filtering.
+
+These tests verify that:
+1. The disposable-domain blocklist loads with and without orjson
+2. A missing or invalid blocklist falls back to an empty set
+3. Emails are found in decoded text and raw response bytes, filtered once each
+4. Generic, disposable and fake addresses are rejected
+5. mailto and internal links are read from <a href> values
+6. Crawled pages are fetched concurrently over one session within the page budget
+7. The homepage is parsed once for both emails and links
+"""
+
+import importlib
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def email_extractor():
+    """Import and return a fresh email_extractor module."""
+    import prospectpilot.email_extractor as ee
+    importlib.reload(ee)
+    return ee
+
+
+class TestLoadDisposableDomains:
+    """Test loading the disposable email blocklist."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_loads_blocklist(self, email_extractor, tmp_path, use_orjson):
+        """Test that the JSON list is loaded into a cached frozenset."""
+        path = tmp_path / "blocklist.json"
+        path.write_text(json.dumps(["mailinator.com", "tempmail.io"]), encoding="utf-8")
+        orjson = email_extractor.orjson if use_orjson else None
+
+        with patch.object(email_extractor, "BLOCKLIST_PATH", str(path)), \
+                patch.object(email_extractor, "orjson", orjson):
+            domains = email_extractor.load_disposable_domains()
+            assert email_extractor.load_disposable_domains() is domains
+
+        assert domains == frozenset({"mailinator.com", "tempmail.io"})
+        assert email_extractor.is_disposable_email("x@Mailinator.com")
+
+    def test_missing_file(self, email_extractor, tmp_path):
+        """Test that a missing blocklist yields an empty set."""
+        with patch.object(email_extractor, "BLOCKLIST_PATH", str(tmp_path / "missing.json")):
+            assert email_extractor.load_disposable_domains() == frozenset()
+
+    def test_invalid_json(self, email_extractor, tmp_path):
+        """Test that a malformed blocklist yields an empty set."""
+        path = tmp_path / "blocklist.json"
+        path.write_text("[not json", encoding="utf-8")
+
+        with patch.object(email_extractor, "BLOCKLIST_PATH", str(path)):
+            assert email_extractor.load_disposable_domains() == frozenset()
+
+
+class TestExtractEmails:
+    """Test free-text email extraction and filtering."""
+
+    def test_filters_and_dedupes(self, email_extractor):
+        """Test that generic, fake-domain and asset matches are dropped."""
+        html = (
+            "Jane.Doe@acme.io jane.doe@ACME.io info@acme.io "
+            "someone@example.com logo@2x.png bob@acme.io"
+        )
+
+        emails = email_extractor.extract_emails_from_html(html, "acme.io")
+
+        assert emails == {"jane.doe@acme.io", "bob@acme.io"}
+
+    def test_raw_bytes_body(self, email_extractor):
+        """Test that an undecoded response body yields the same emails as text."""
+        html = '<p>Café owner: jane.doe@acme.io</p><a href="mailto:bob@acme.io">Bob</a>'
+
+        from_bytes = email_extractor.extract_emails_from_html(html.encode("utf-8"), "acme.io")
+
+        assert from_bytes == email_extractor.extract_emails_from_html(html, "acme.io")
+        assert from_bytes == {"jane.doe@acme.io", "bob@acme.io"}
+        assert all(isinstance(email, str) for email in from_bytes)
+
+    def test_repeated_address_checked_once(self, email_extractor):
+        """Test that repeats of an address don't rerun the filters."""
+        html = " ".join(["sales@acme.io"] * 50)
+
+        with patch.object(email_extractor, "_split_email", wraps=email_extractor._split_email) as check:
+            assert email_extractor.extract_emails_from_html(html, "acme.io") == set()
+
+        check.assert_called_once()
+
+
+class TestEmailPredicates:
+    """Test the single-address filters."""
+
+    def test_is_generic_email(self, email_extractor):
+        """Test that the local part is compared case-insensitively."""
+        assert email_extractor.is_generic_email("Info@acme.io")
+        assert not email_extractor.is_generic_email("jane@acme.io")
+
+    def test_is_disposable_email(self, email_extractor):
+        """Test domain lookup, including malformed addresses."""
+        with patch.object(email_extractor, "_disposable_domains_cache", frozenset({"mailinator.com"})):
+            assert email_extractor.is_disposable_email("Bob@Mailinator.com")
+            assert not email_extractor.is_disposable_email("bob@acme.io")
+            assert not email_extractor.is_disposable_email("mailinator.com")
+            assert not email_extractor.is_disposable_email("a@b@mailinator.com")
+
+    def test_is_valid_email(self, email_extractor):
+        """Test that each filter rejects its own class of address."""
+        with patch.object(email_extractor, "_disposable_domains_cache", frozenset({"mailinator.com"})):
+            assert email_extractor.is_valid_email("Jane@Acme.io", "acme.io")
+            assert not email_extractor.is_valid_email("support@acme.io", "acme.io")
+            assert not email_extractor.is_valid_email("x@mailinator.com", "acme.io")
+            assert not email_extractor.is_valid_email("x@example.com", "acme.io")
+            assert not email_extractor.is_valid_email("logo@2x.png", "acme.io")
+
+
+class TestLinkExtraction:
+    """Test href-based email and link extraction."""
+
+    def test_mailto_links(self, email_extractor):
+        """Test that mailto hrefs are collected without their query string."""
+        html = '<a href="mailto:Jo.Smith@acme.io?subject=Hi">Email</a><a href="mailto:info@acme.io">x</a>'
+
+        assert email_extractor.extract_emails_from_html(html, "acme.io") == {"jo.smith@acme.io"}
+
+    def test_internal_links(self, email_extractor):
+        """Test that only same-site page links are kept, without query strings."""
+        html = (
+            '<A HREF=" /contact?ref=nav ">Contact</A>'
+            '<a href="https://other.com/x">x</a>'
+            '<a href="#top">top</a><a href="tel:123">call</a><a>no href</a>'
+        )
+
+        links = email_extractor.get_internal_links(html, "https://acme.io/", "acme.io")
+
+        assert links == {"https://acme.io/contact"}
+
+    @pytest.mark.parametrize("html", [
+        "",
+        "   ",
+        '<?xml version="1.0" encoding="utf-8"?><html></html>',
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<?xml version="1.0" encoding="utf-8"?>\n  <!-- empty -->\n',
+    ])
+    def test_documents_without_links(self, email_extractor, html):
+        """Test that empty documents and XML-declared pages parse cleanly."""
+        assert email_extractor.get_internal_links(html, "https://acme.io/", "acme.io") == set()
+
+
+    def test_crawl_with_declaration_only_homepage(self, email_extractor):
+        """Test that a declaration-only homepage doesn't abort the crawl."""
+        with patch.object(email_extractor, "CONTACT_PATHS", []), \
+                patch.object(email_extractor.requests, "Session"):
+            emails = email_extractor.crawl_for_emails(
+                "https://acme.io", "acme.io", '<?xml version="1.0" encoding="utf-8"?>'
+            )
+
+        assert emails == set()
+
+
+def _html_response(body: str, status_code: int = 200, content_type: str = "text/html") -> MagicMock:
+    """Build a fake requests response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {"content-type": content_type}
+    response.content = body.encode("utf-8")
+    return response
+
+
+class TestCrawlForEmails:
+    """Test the contact-page crawl."""
+
+    def test_fetches_pages_over_one_session(self, email_extractor):
+        """Test that pages share a session and their emails are merged."""
+        pages = {
+            "https://acme.io/contact": _html_response("jane.doe@acme.io"),
+            "https://acme.io/about": _html_response("<p>bob.smith@acme.io</p>"),
+            "https://acme.io/team": _html_response("nope", status_code=404),
+        }
+        with patch.object(email_extractor, "CONTACT_PATHS", ["/contact", "/about", "/team"]), \
+                patch.object(email_extractor.requests, "Session") as session_cls:
+            session = session_cls.return_value
+            session.get.side_effect = lambda url, **kwargs: pages[url]
+
+            emails = email_extractor.crawl_for_emails(
+                "https://acme.io", "acme.io", "<html></html>", max_pages=10
+            )
+
+        assert emails == {"jane.doe@acme.io", "bob.smith@acme.io"}
+        session_cls.assert_called_once()
+        assert session.get.call_count == 3
+        session.close.assert_called_once()
+
+    def test_respects_page_budget(self, email_extractor):
+        """Test that no more than max_pages - 1 extra pages are fetched."""
+        paths = [f"/p{i}" for i in range(20)]
+        with patch.object(email_extractor, "CONTACT_PATHS", paths), \
+                patch.object(email_extractor.requests, "Session") as session_cls:
+            session = session_cls.return_value
+            session.get.return_value = _html_response("<html></html>")
+
+            email_extractor.crawl_for_emails("https://acme.io", "acme.io", "<html></html>", max_pages=5)
+
+        assert session.get.call_count == 4
+
+    def test_homepage_parsed_once(self, email_extractor):
+        """Test that the homepage HTML is parsed a single time for emails and links."""
+        with patch.object(email_extractor, "CONTACT_PATHS", []), \
+                patch.object(email_extractor.requests, "Session"), \
+                patch.object(email_extractor, "_extract_hrefs", wraps=email_extractor._extract_hrefs) as extract:
+            emails = email_extractor.crawl_for_emails(
+                "https://acme.io", "acme.io", "<a href='mailto:owner@acme.io'>x</a>", max_pages=1
+            )
+
+        assert emails == {"owner@acme.io"}
+        extract.assert_called_once()
+
+    def test_failed_requests_are_skipped(self, email_extractor):
+        """Test that request errors don't abort the crawl."""
+        with patch.object(email_extractor, "CONTACT_PATHS", ["/contact"]), \
+                patch.object(email_extractor.requests, "Session") as session_cls:
+            session_cls.return_value.get.side_effect = email_extractor.requests.ConnectionError("boom")
+
+            emails = email_extractor.crawl_for_emails(
+                "https://acme.io", "acme.io", "<a href='mailto:owner@acme.io'>x</a>"
+            )
+
+        assert emails == {"owner@acme.io"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,230 @@
+"""
+Tests for outreach worker helpers.
+
+These tests verify that:
+1. Recently emailed recipients are fetched and normalized correctly
+2. Recipient lookups fail gracefully and page past PostgREST's row cap
+3. Leads skipped as duplicates are marked so they aren't fetched again
+4. Leads without technology data get the unindented fallback email
+5. SMTP fleet entries carry a pre-masked email for logging
+6. SMTP connections are reused across sends, reopened when dropped and
+   closed even when the run fails
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def outreach_worker():
+    """Import and return a fresh outreach_worker module."""
+    import importlib
+    import outreach_worker as ow
+    importlib.reload(ow)
+    return ow
+
+
+class TestFetchRecentRecipients:
+    """Test recently emailed recipient lookup."""
+
+    def test_returns_empty_when_cooldown_zero(self, outreach_worker):
+        """Test that Supabase is not queried when cooldown is disabled."""
+        mock_supabase = MagicMock()
+
+        result = outreach_worker.fetch_recent_recipients(mock_supabase, 0)
+
+        assert result == set()
+        mock_supabase.table.assert_not_called()
+
+    def test_returns_lowercased_first_recipients(self, outreach_worker):
+        """Test that only the first (sent-to) address is collected, lowercased."""
+        mock_supabase = MagicMock()
+        query = mock_supabase.table.return_value.select.return_value.gte.return_value.order.return_value
+        query.range.return_value.execute.return_value.data = [
+            {"emails": ["Jane@Example.io", "bob@example.io"]},
+            {"emails": []},
+            {"emails": None},
+        ]
+
+        result = outreach_worker.fetch_recent_recipients(mock_supabase, 7)
+
+        assert result == {"jane@example.io"}
+
+    def test_handles_supabase_error_gracefully(self, outreach_worker):
+        """Test that lookup errors don't crash the worker."""
+        mock_supabase = MagicMock()
+        query = mock_supabase.table.return_value.select.return_value.gte.return_value.order.return_value
+        query.range.return_value.execute.side_effect = Exception("Connection error")
+
+        result = outreach_worker.fetch_recent_recipients(mock_supabase, 7)
+
+        assert result == set()
+
+    def test_pages_through_all_rows(self, outreach_worker):
+        """Test that lookups beyond one PostgREST page aren't truncated."""
+        from postgrest import SyncPostgrestClient
+        from postgrest._sync.request_builder import SyncQueryRequestBuilder
+
+        outreach_worker.RECIPIENT_PAGE_SIZE = 2
+        pages = {
+            "0": [{"emails": ["a@x.io"]}, {"emails": ["b@x.io"]}],
+            "2": [{"emails": ["c@x.io"]}, {"emails": ["d@x.io"]}],
+            "4": [{"emails": ["e@x.io"]}],
+        }
+        sent_params = []
+
+        def execute(builder):
+            params = builder.request.params
+            sent_params.append(params)
+            return MagicMock(data=pages.pop(params["offset"], []))
+
+        mock_supabase = MagicMock()
+        mock_supabase.table.side_effect = SyncPostgrestClient("http://localhost").from_
+
+        with patch.object(SyncQueryRequestBuilder, "execute", autospec=True, side_effect=execute):
+            result = outreach_worker.fetch_recent_recipients(mock_supabase, 7)
+
+        assert result == {"a@x.io", "b@x.io", "c@x.io", "d@x.io", "e@x.io"}
+        # Each page sends exactly one offset/limit pair
+        assert [params.get_list("offset") for params in sent_params] == [["0"], ["2"], ["4"]]
+        assert all(params.get_list("limit") == ["2"] for params in sent_params)
+
+
+class TestDuplicateRecipientLeads:
+    """Test handling of leads whose recipient was already emailed."""
+
+    def test_skipped_lead_is_marked(self, outreach_worker):
+        """Test that a duplicate-recipient lead is marked so it isn't fetched again."""
+        mock_supabase = MagicMock()
+        lead = {"id": "lead-1", "domain": "acme.io", "emails": ["Jane@acme.io"], "technologies": ["Shopify"]}
+        fleet = [{"user": "a@example.com", "pass": "x", "masked_email": "a@e***"}]
+
+        with patch.object(outreach_worker, "get_supabase_client", return_value=mock_supabase), \
+                patch.object(outreach_worker, "get_smtp_fleet", return_value=fleet), \
+                patch.object(outreach_worker, "fetch_leads", return_value=[lead]), \
+                patch.object(outreach_worker, "fetch_recent_recipients", return_value={"jane@acme.io"}), \
+                patch.object(outreach_worker, "send_email_smtp") as send:
+            stats = outreach_worker.run_outreach()
+
+        assert stats == {"sent": 0, "failed": 0, "skipped": 1}
+        send.assert_not_called()
+        mock_supabase.table.return_value.update.assert_called_once_with({"emailed": False})
+        mock_supabase.table.return_value.update.return_value.eq.assert_called_once_with("id", "lead-1")
+
+
+class TestFallbackEmail:
+    """Test the plain email sent when a lead has no technology data."""
+
+    def test_fallback_body_is_not_indented(self, outreach_worker):
+        """Test that the fallback body text starts every line at column 0."""
+        lead = {"id": "lead-1", "domain": "acme.io", "emails": ["jane@acme.io"]}
+        fleet = [{"user": "a@example.com", "pass": "x", "masked_email": "a@e***"}]
+
+        with patch.object(outreach_worker, "get_supabase_client"), \
+                patch.object(outreach_worker, "get_smtp_fleet", return_value=fleet), \
+                patch.object(outreach_worker, "fetch_leads", return_value=[lead]), \
+                patch.object(outreach_worker, "fetch_recent_recipients", return_value=set()), \
+                patch.object(outreach_worker.time, "sleep"), \
+                patch.object(outreach_worker, "send_email_smtp", return_value=True) as send:
+            stats = outreach_worker.run_outreach()
+
+        assert stats["sent"] == 1
+        kwargs = send.call_args.kwargs
+        assert kwargs["subject"] == "Quick question about acme.io"
+        body = kwargs["body"]
+        assert "\n\nI came across acme.io and wanted to reach out." in body
+        assert "\n• Integration and sync issues between tools\n" in body
+        assert body.endswith(outreach_worker.CLOSESPARK_PROFILE["github"])
+        assert not any(line.startswith(" ") for line in body.splitlines())
+
+
+class TestSmtpFleetMasking:
+    """Test email masking for SMTP fleet logging."""
+
+    def test_mask_email(self, outreach_worker):
+        """Test masking keeps the first three characters and the domain."""
+        assert outreach_worker.mask_email("scott@closespark.co") == "sco***@closespark.co"
+        assert outreach_worker.mask_email("scott") == "sco***"
+
+    def test_fleet_entries_have_masked_email(self, outreach_worker):
+        """Test both config formats get a masked_email field."""
+        accounts = {
+            "inboxes": [
+                {"email": "scott@closespark.co", "smtp_user": "scott@closespark.co", "smtp_password": "x"},
+            ]
+        }
+        with patch.dict(os.environ, {"SMTP_ACCOUNTS_JSON": json.dumps(accounts)}):
+            fleet = outreach_worker.get_smtp_fleet()
+        assert fleet[0]["masked_email"] == "sco***@closespark.co"
+
+        legacy = [{"user": "chris@closespark.co", "pass": "x"}]
+        with patch.dict(os.environ, {"SMTP_ACCOUNTS_JSON": json.dumps(legacy)}):
+            fleet = outreach_worker.get_smtp_fleet()
+        assert fleet[0]["masked_email"] == "chr***@closespark.co"
+
+
+class TestSmtpSession:
+    """Test SMTP connection reuse across sends."""
+
+    SMTP_CONF = {"host": "smtp.example.com", "port": 587, "user": "a@example.com", "pass": "x"}
+
+    def test_connection_reused_across_sends(self, outreach_worker):
+        """Test that only the first send connects and logs in."""
+        with patch.object(outreach_worker.smtplib, "SMTP") as smtp_cls:
+            session = outreach_worker.SmtpSession(self.SMTP_CONF)
+            for to in ("x@example.io", "y@example.io"):
+                assert outreach_worker.send_email_smtp(
+                    self.SMTP_CONF, to_email=to, subject="s", body="b", session=session
+                )
+            session.close()
+
+        smtp_cls.assert_called_once_with("smtp.example.com", 587)
+        server = smtp_cls.return_value
+        server.login.assert_called_once()
+        assert server.sendmail.call_count == 2
+        server.quit.assert_called_once()
+
+    def test_reconnects_after_server_disconnect(self, outreach_worker):
+        """Test that an idle-dropped connection is reopened and the send retried."""
+        stale, fresh = MagicMock(), MagicMock()
+        stale.sendmail.side_effect = outreach_worker.smtplib.SMTPServerDisconnected("gone")
+        with patch.object(outreach_worker.smtplib, "SMTP", side_effect=[stale, fresh]):
+            session = outreach_worker.SmtpSession(self.SMTP_CONF)
+            session.sendmail("a@example.com", ["x@example.io"], "msg")
+
+        fresh.sendmail.assert_called_once_with("a@example.com", ["x@example.io"], "msg")
+        assert session.server is fresh
+
+    def test_without_session_connection_is_closed(self, outreach_worker):
+        """Test the one-off path opens and closes its own connection."""
+        with patch.object(outreach_worker.smtplib, "SMTP") as smtp_cls:
+            assert outreach_worker.send_email_smtp(
+                self.SMTP_CONF, to_email="x@example.io", subject="s", body="b"
+            )
+
+        smtp_cls.return_value.quit.assert_called_once()
+
+    def test_sessions_closed_when_send_loop_raises(self, outreach_worker):
+        """Test that open inbox connections are closed even if the run fails."""
+        lead = {"id": "lead-1", "domain": "acme.io", "emails": ["jane@acme.io"], "technologies": ["Shopify"]}
+        fleet = [dict(self.SMTP_CONF, masked_email="a@e***")]
+
+        with patch.object(outreach_worker, "get_supabase_client"), \
+                patch.object(outreach_worker, "get_smtp_fleet", return_value=fleet), \
+                patch.object(outreach_worker, "fetch_leads", return_value=[lead, dict(lead, id="lead-2", emails=["bob@acme.io"])]), \
+                patch.object(outreach_worker, "fetch_recent_recipients", return_value=set()), \
+                patch.object(outreach_worker, "generate_outreach_email_with_persona",
+                             side_effect=[{"subject": "s", "body": "b"}, RuntimeError("template error")]), \
+                patch.object(outreach_worker.time, "sleep"), \
+                patch.object(outreach_worker.smtplib, "SMTP") as smtp_cls:
+            with pytest.raises(RuntimeError):
+                outreach_worker.run_outreach()
+
+        smtp_cls.return_value.quit.assert_called_once()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
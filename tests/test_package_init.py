@@ -0,0 +1,56 @@
+"""
+Tests for the package's lazy public API.
+
+These tests verify that:
+1. Importing the package does not import its submodules
+2. Public names resolve on first access and are cached afterwards
+3. Unknown names still raise AttributeError
+"""
+
+import importlib
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def prospectpilot():
+    """Import and return a fresh prospectpilot package."""
+    import prospectpilot as pp
+    importlib.reload(pp)
+    return pp
+
+
+class TestLazyExports:
+    """Test PEP 562 attribute loading."""
+
+    def test_every_public_name_resolves(self, prospectpilot):
+        """Test that each name in __all__ maps to a real attribute."""
+        assert set(prospectpilot.__all__) == set(prospectpilot._LAZY)
+        for name in prospectpilot.__all__:
+            assert getattr(prospectpilot, name) is not None
+
+    def test_resolved_name_is_cached(self, prospectpilot):
+        """Test that a resolved name is stored on the package module."""
+        detector_cls = prospectpilot.TechDetector
+
+        assert vars(prospectpilot)["TechDetector"] is detector_cls
+        assert detector_cls is sys.modules["prospectpilot.tech_detector"].TechDetector
+
+    def test_unknown_name_raises(self, prospectpilot):
+        """Test that missing attributes raise AttributeError."""
+        with pytest.raises(AttributeError):
+            prospectpilot.does_not_exist
+
+    def test_import_does_not_load_submodules(self):
+        """Test that a bare package import stays light."""
+        code = (
+            "import sys, prospectpilot; "
+            "sys.exit(any(m.startswith('prospectpilot.') for m in sys.modules))"
+        )
+        assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,401 @@
+"""
+Tests for pipeline worker scanning logic.
+
+These tests verify that:
+1. Technology scans run for every domain and results are saved
+2. A failing scan is recorded as an error row without stopping the batch
+3. Scan results are inserted in batches, falling back to single rows, and
+   flushed on a completion count or timer
+4. Domains are extracted, normalized and deduped from Apify places
+5. Domain dedup against Supabase uses the RPCs when configured
+6. A failed background domains upsert fails the pipeline run
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from prospectpilot.tech_scanner import TechScanResult
+
+
+@pytest.fixture
+def pipeline_worker():
+    """Import and return a fresh pipeline_worker module."""
+    import importlib
+    import pipeline_worker as pw
+    importlib.reload(pw)
+    return pw
+
+
+def fake_scan(domain, generate_email=True):
+    """Stand-in for scan_technologies that never touches the network."""
+    if domain == "broken.com":
+        raise RuntimeError("boom")
+    if domain == "shop.com":
+        return TechScanResult(domain=domain, technologies=["Shopify"])
+    return TechScanResult(domain=domain)
+
+
+class TestRunTechnologyScans:
+    """Test concurrent technology scanning."""
+
+    def test_scans_all_domains(self, pipeline_worker):
+        """Test that every domain produces exactly one result."""
+        domains = ["shop.com", "plain.com", "broken.com", "other.com"]
+        mock_supabase = MagicMock()
+
+        with patch.object(pipeline_worker, "scan_technologies", side_effect=fake_scan):
+            results = pipeline_worker.run_technology_scans(mock_supabase, domains, "cat")
+
+        assert sorted(r["domain"] for r in results) == sorted(domains)
+
+    def test_failed_scan_recorded_as_error(self, pipeline_worker):
+        """Test that an exception becomes an error result instead of propagating."""
+        mock_supabase = MagicMock()
+
+        with patch.object(pipeline_worker, "scan_technologies", side_effect=fake_scan):
+            results = pipeline_worker.run_technology_scans(
+                mock_supabase, ["broken.com", "shop.com"], "cat"
+            )
+
+        by_domain = {r["domain"]: r for r in results}
+        assert by_domain["broken.com"]["error"] == "boom"
+        assert by_domain["shop.com"]["technologies"] == ["Shopify"]
+
+    def test_duplicate_domains_scanned_once(self, pipeline_worker):
+        """Test that a repeated domain is only scanned once per run."""
+        mock_supabase = MagicMock()
+
+        with patch.object(pipeline_worker, "scan_technologies", side_effect=fake_scan) as scan:
+            results = pipeline_worker.run_technology_scans(
+                mock_supabase, ["shop.com", "plain.com", "shop.com"], "cat"
+            )
+
+        assert scan.call_count == 2
+        assert sorted(r["domain"] for r in results) == ["plain.com", "shop.com"]
+
+    def test_every_result_uploaded_once(self, pipeline_worker):
+        """Test that background batch uploads cover every scanned domain."""
+        pipeline_worker.SCAN_INSERT_BATCH_SIZE = 2
+        domains = ["shop.com", "plain.com", "broken.com", "other.com", "last.com"]
+        mock_supabase = MagicMock()
+
+        with patch.object(pipeline_worker, "scan_technologies", side_effect=fake_scan):
+            pipeline_worker.run_technology_scans(mock_supabase, domains, "cat")
+
+        insert = mock_supabase.table.return_value.insert
+        uploaded = [row["domain"] for c in insert.call_args_list for row in c.args[0]]
+        assert sorted(uploaded) == sorted(domains)
+
+    def test_flushes_every_n_completions(self, pipeline_worker):
+        """Test that results are flushed on completion count, not only on full batches."""
+        pipeline_worker.SCAN_INSERT_BATCH_SIZE = 500
+        pipeline_worker.SCAN_FLUSH_EVERY = 2
+        domains = ["a.com", "b.com", "c.com", "d.com", "e.com"]
+        mock_supabase = MagicMock()
+
+        with patch.object(pipeline_worker, "scan_technologies", side_effect=fake_scan):
+            pipeline_worker.run_technology_scans(mock_supabase, domains, "cat")
+
+        insert = mock_supabase.table.return_value.insert
+        assert sorted(len(c.args[0]) for c in insert.call_args_list) == [1, 2, 2]
+
+    def test_flushes_on_interval(self, pipeline_worker):
+        """Test that slow runs still flush once the interval has elapsed."""
+        pipeline_worker.SCAN_FLUSH_EVERY = 100
+        pipeline_worker.SCAN_FLUSH_INTERVAL = 0
+        domains = ["a.com", "b.com", "c.com"]
+        mock_supabase = MagicMock()
+
+        with patch.object(pipeline_worker, "scan_technologies", side_effect=fake_scan):
+            pipeline_worker.run_technology_scans(mock_supabase, domains, "cat")
+
+        insert = mock_supabase.table.return_value.insert
+        assert [len(c.args[0]) for c in insert.call_args_list] == [1, 1, 1]
+
+
+class TestSaveScanResults:
+    """Test batched scan result inserts."""
+
+    def test_inserts_in_batches(self, pipeline_worker):
+        """Test that rows are chunked by SCAN_INSERT_BATCH_SIZE."""
+        pipeline_worker.SCAN_INSERT_BATCH_SIZE = 2
+        mock_supabase = MagicMock()
+        results = [{"domain": f"d{i}.com"} for i in range(5)]
+
+        saved = pipeline_worker.save_scan_results(mock_supabase, results, "cat")
+
+        assert saved == 5
+        insert = mock_supabase.table.return_value.insert
+        assert [len(c.args[0]) for c in insert.call_args_list] == [2, 2, 1]
+        assert insert.call_args_list[0].args[0][0]["category"] == "cat"
+        assert insert.call_args_list[0].kwargs["returning"] == pipeline_worker.ReturnMethod.minimal
+
+    def test_failed_batch_retried_row_by_row(self, pipeline_worker):
+        """Test that one bad row doesn't lose the rest of its batch."""
+        mock_supabase = MagicMock()
+
+        def insert(payload, **kwargs):
+            query = MagicMock()
+            if isinstance(payload, list) or payload["domain"] == "bad.com":
+                query.execute.side_effect = Exception("bad row")
+            return query
+
+        mock_supabase.table.return_value.insert.side_effect = insert
+        results = [{"domain": "good.com"}, {"domain": "bad.com"}, {"domain": "fine.com"}]
+
+        saved = pipeline_worker.save_scan_results(mock_supabase, results, "cat")
+
+        assert saved == 2
+
+
+def make_apify_client(items):
+    """Build a mock Apify client whose run succeeds with the given places."""
+    apify_client = MagicMock()
+    apify_client.actor.return_value.start.return_value = {
+        "id": "run-1",
+        "defaultDatasetId": "ds-1",
+        "status": "RUNNING",
+    }
+    apify_client.run.return_value.wait_for_finish.return_value = {"status": "SUCCEEDED"}
+    apify_client.dataset.return_value.iterate_items.return_value = iter(items)
+    return apify_client
+
+
+class TestNormalizeDomain:
+    """Test website URL to domain normalization."""
+
+    @pytest.mark.parametrize(
+        "url,expected",
+        [
+            ("https://www.example.com/contact", "example.com"),
+            ("http://example.com", "example.com"),
+            ("HTTPS://WWW.Example.COM", "example.com"),
+            ("example.com/path?q=1", "example.com"),
+            ("//example.com", "example.com"),
+            ("https://example.com:8080/", "example.com"),
+            ("https://user:pw@example.com/", "example.com"),
+            ("  shop.example.com  ", "shop.example.com"),
+            ("https://", ""),
+            ("", ""),
+        ],
+    )
+    def test_normalize_domain(self, pipeline_worker, url, expected):
+        """Test that scheme, www., port, userinfo and path are stripped."""
+        assert pipeline_worker._normalize_domain(url) == expected
+
+
+class TestGetDomainsFromCategory:
+    """Test domain extraction from Apify dataset items."""
+
+    def test_extracts_normalized_unique_domains(self, pipeline_worker):
+        """Test normalization, dedup and order preservation."""
+        items = [
+            {"website": "https://www.Example.com/contact"},
+            {"website": None},
+            {"website": "http://other.com"},
+            {"website": "example.com/"},
+            {},
+        ]
+        apify_client = make_apify_client(items)
+
+        domains = pipeline_worker.get_domains_from_category(apify_client, "plumbers")
+
+        assert domains == ["example.com", "other.com"]
+        apify_client.dataset.return_value.iterate_items.assert_called_once_with(fields=["website"])
+
+    def test_run_input_built_from_template(self, pipeline_worker):
+        """Test that the actor input combines the template with per-run fields."""
+        apify_client = make_apify_client([])
+
+        pipeline_worker.get_domains_from_category(apify_client, "plumbers")
+
+        run_input = apify_client.actor.return_value.start.call_args.kwargs["run_input"]
+        assert run_input["searchStringsArray"] == ["plumbers"]
+        assert run_input["maxCrawledPlacesPerSearch"] == pipeline_worker.APIFY_MAX_PLACES
+        assert run_input["website"] == "withWebsite"
+        assert "searchStringsArray" not in pipeline_worker._APIFY_PAYLOAD_TEMPLATE
+
+
+    @pytest.mark.parametrize(
+        "status,message",
+        [
+            ("FAILED", "Apify run failed: quota exceeded"),
+            ("TIMED-OUT", "Apify run timed out on the server side"),
+            ("ABORTED", "Apify run was aborted"),
+        ],
+    )
+    def test_terminal_failure_raises(self, pipeline_worker, status, message):
+        """Test that each failed terminal status raises with its message."""
+        apify_client = make_apify_client([])
+        apify_client.run.return_value.wait_for_finish.return_value = {
+            "status": status,
+            "statusMessage": "quota exceeded",
+        }
+
+        with pytest.raises(RuntimeError, match=message):
+            pipeline_worker.get_domains_from_category(apify_client, "plumbers")
+
+    def test_failed_polls_back_off(self, pipeline_worker):
+        """Test that missing run info is retried with growing, jittered delays."""
+        apify_client = make_apify_client([{"website": "https://a.com"}])
+        apify_client.run.return_value.wait_for_finish.side_effect = [
+            None,
+            None,
+            {"status": "SUCCEEDED"},
+        ]
+
+        with patch.object(pipeline_worker.time, "sleep") as sleep, \
+                patch.object(pipeline_worker.random, "uniform", side_effect=lambda lo, hi: hi) as uniform:
+            domains = pipeline_worker.get_domains_from_category(apify_client, "plumbers")
+
+        assert domains == ["a.com"]
+        assert [c.args for c in uniform.call_args_list] == [(0, 2.0), (0, 4.0)]
+        assert [c.args[0] for c in sleep.call_args_list] == [2.0, 4.0]
+
+
+class TestFilterNewDomains:
+    """Test deduplication against the domains table."""
+
+    def test_select_path_diffs_locally(self, pipeline_worker):
+        """Test the default SELECT + local diff path."""
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [
+            {"domain": "old.com"},
+        ]
+
+        result = pipeline_worker.filter_new_domains(mock_supabase, ["old.com", "new.com"], "cat")
+
+        assert result == ["new.com"]
+        mock_supabase.rpc.assert_not_called()
+
+    def test_select_path_chunks_lookup(self, pipeline_worker):
+        """Test that large domain lists are looked up in bounded chunks."""
+        pipeline_worker.DOMAIN_LOOKUP_CHUNK_SIZE = 2
+        mock_supabase = MagicMock()
+        in_ = mock_supabase.table.return_value.select.return_value.in_
+        in_.return_value.execute.return_value.data = []
+
+        pipeline_worker.query_seen_domains(mock_supabase, ["a.com", "b.com", "c.com"])
+
+        assert sorted(c.args[1] for c in in_.call_args_list) == [["a.com", "b.com"], ["c.com"]]
+
+    def test_select_path_merges_parallel_chunks(self, pipeline_worker):
+        """Test that seen domains from every chunk are merged."""
+        pipeline_worker.DOMAIN_LOOKUP_CHUNK_SIZE = 1
+        mock_supabase = MagicMock()
+
+        def in_(column, chunk):
+            query = MagicMock()
+            query.execute.return_value.data = [{"domain": d} for d in chunk if d.startswith("old")]
+            return query
+
+        mock_supabase.table.return_value.select.return_value.in_.side_effect = in_
+
+        seen = pipeline_worker.query_seen_domains(mock_supabase, ["old1.com", "new.com", "old2.com"])
+
+        assert seen == {"old1.com", "old2.com"}
+
+    def test_find_new_domains_leaves_recording_to_caller(self, pipeline_worker):
+        """Test that the lookup alone doesn't upsert, so main can run it in the background."""
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = []
+
+        result = pipeline_worker.find_new_domains(mock_supabase, ["a.com"], "cat")
+
+        assert result == (["a.com"], False)
+        mock_supabase.table.return_value.upsert.assert_not_called()
+
+    def test_upsert_is_batched(self, pipeline_worker):
+        """Test that new domains are upserted in bounded batches."""
+        pipeline_worker.DOMAIN_UPSERT_BATCH_SIZE = 2
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = []
+
+        pipeline_worker.filter_new_domains(mock_supabase, ["a.com", "b.com", "c.com"], "cat")
+
+        upsert = mock_supabase.table.return_value.upsert
+        assert sorted(len(c.args[0]) for c in upsert.call_args_list) == [1, 2]
+
+    def test_rpc_path_returns_unseen(self, pipeline_worker):
+        """Test that the RPC result is used when configured."""
+        pipeline_worker.SUPABASE_NEW_DOMAINS_RPC = "new_domains"
+        mock_supabase = MagicMock()
+        mock_supabase.rpc.return_value.execute.return_value.data = [{"domain": "new.com"}]
+
+        result = pipeline_worker.filter_new_domains(mock_supabase, ["old.com", "new.com"], "cat")
+
+        assert result == ["new.com"]
+        mock_supabase.table.return_value.select.assert_not_called()
+
+    def test_rpc_failure_falls_back_to_select(self, pipeline_worker):
+        """Test that a missing RPC doesn't break deduplication."""
+        pipeline_worker.SUPABASE_NEW_DOMAINS_RPC = "new_domains"
+        mock_supabase = MagicMock()
+        mock_supabase.rpc.return_value.execute.side_effect = Exception("function not found")
+        mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = []
+
+        result = pipeline_worker.filter_new_domains(mock_supabase, ["a.com", "b.com"], "cat")
+
+        assert result == ["a.com", "b.com"]
+
+    def test_insert_rpc_skips_lookup_and_upsert(self, pipeline_worker):
+        """Test that the insert-returning RPC replaces SELECT + upsert."""
+        pipeline_worker.SUPABASE_INSERT_DOMAINS_RPC = "insert_new_domains"
+        mock_supabase = MagicMock()
+        mock_supabase.rpc.return_value.execute.return_value.data = ["new.com"]
+
+        result = pipeline_worker.filter_new_domains(mock_supabase, ["old.com", "new.com"], "cat")
+
+        assert result == ["new.com"]
+        mock_supabase.rpc.assert_called_once_with(
+            "insert_new_domains",
+            {"p_rows": [{"domain": "old.com", "category": "cat"}, {"domain": "new.com", "category": "cat"}]},
+        )
+        mock_supabase.table.assert_not_called()
+
+    def test_insert_rpc_failure_falls_back_to_upsert(self, pipeline_worker):
+        """Test that a missing insert RPC still dedups and upserts."""
+        pipeline_worker.SUPABASE_INSERT_DOMAINS_RPC = "insert_new_domains"
+        mock_supabase = MagicMock()
+        mock_supabase.rpc.return_value.execute.side_effect = Exception("function not found")
+        mock_supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = []
+
+        result = pipeline_worker.filter_new_domains(mock_supabase, ["a.com"], "cat")
+
+        assert result == ["a.com"]
+        mock_supabase.table.return_value.upsert.assert_called_once()
+
+
+
+class TestMainRecordsSeenDomains:
+    """Test that main only succeeds once new domains are recorded."""
+
+    def run_main(self, pipeline_worker, mark_seen):
+        """Run main with every external call patched out."""
+        mock_supabase = MagicMock()
+        with patch.object(pipeline_worker, "get_supabase_client", return_value=mock_supabase), \
+                patch.object(pipeline_worker, "get_apify_client"), \
+                patch.object(pipeline_worker, "load_categories", return_value=("cat",)), \
+                patch.object(pipeline_worker, "pick_today_category", return_value=("cat", 0)), \
+                patch.object(pipeline_worker, "get_domains_from_category", return_value=["a.com", "b.com"]), \
+                patch.object(pipeline_worker, "find_new_domains", return_value=(["a.com"], False)), \
+                patch.object(pipeline_worker, "mark_domains_seen", side_effect=mark_seen) as mark, \
+                patch.object(pipeline_worker, "record_category_used"), \
+                patch.object(pipeline_worker, "run_technology_scans", return_value=[{"domain": "a.com"}]) as scans:
+            pipeline_worker.main()
+        mark.assert_called_once_with(mock_supabase, ["a.com"], "cat")
+        scans.assert_called_once()
+
+    def test_succeeds_when_upsert_succeeds(self, pipeline_worker):
+        """Test the normal path records the new domains and completes."""
+        self.run_main(pipeline_worker, None)
+
+    def test_fails_when_upsert_fails(self, pipeline_worker):
+        """Test that an upsert error raised in the background fails the run."""
+        with pytest.raises(RuntimeError, match="Failed to record 1 new domains"):
+            self.run_main(pipeline_worker, Exception("connection reset"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,64 @@
+"""
+Tests for technology detection.
+
+These tests verify that:
+1. Script, HTML and JS variable patterns are matched in page content
+2. Header patterns match by (case-insensitive) name prefix
+3. Patterns are compiled once and shared across detector instances
+4. Overriding the patterns table on an instance takes effect
+"""
+
+import pytest
+
+from prospectpilot.tech_detector import TECHNOLOGY_PATTERNS, TechDetector
+
+
+class TestTechDetector:
+    """Test pattern matching against HTML and headers."""
+
+    def test_detects_script_patterns(self):
+        """Test that a HubSpot tracking script is detected."""
+        html = '<script src="https://js.hs-scripts.com/123.js"></script>'
+
+        result = TechDetector().detect("example.com", html)
+
+        assert "HubSpot" in result.technologies
+        details = {d["name"]: d for d in result.tech_details}
+        assert details["HubSpot"]["matched_patterns"][0].startswith("script: ")
+
+    def test_detects_header_prefix_case_insensitive(self):
+        """Test that header names match by prefix regardless of case."""
+        result = TechDetector().detect("example.com", "<html></html>", {"X-Shopify-Stage": "production"})
+
+        assert result.technologies == ["Shopify"]
+        assert result.tech_details[0]["matched_patterns"] == ["header: x-shopify-"]
+
+    def test_no_match(self):
+        """Test that plain HTML yields no technologies."""
+        result = TechDetector().detect("example.com", "<html><body>hello</body></html>")
+
+        assert result.technologies == []
+        assert result.tech_details == []
+
+    def test_patterns_compiled_once(self):
+        """Test that detectors share one precompiled pattern table."""
+        first, second = TechDetector(), TechDetector()
+
+        assert first._compiled is second._compiled
+        assert len(first._compiled) == len(TECHNOLOGY_PATTERNS)
+
+    def test_overridden_patterns_are_used(self):
+        """Test that replacing self.patterns recompiles for that instance only."""
+        detector = TechDetector()
+        detector.patterns = {
+            "Acme Widget": {"category": "Widgets", "score": 3, "patterns": {"html": [r"acme-widget"]}},
+        }
+
+        result = detector.detect("example.com", '<div class="acme-widget"></div>')
+
+        assert result.technologies == ["Acme Widget"]
+        assert TechDetector()._compiled is not detector._compiled
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])